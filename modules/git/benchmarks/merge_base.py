@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Compare merge-base latency with and without commit-graph maintenance."""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Commands run by Git.with_maintenance() for its default tasks.
+MAINTENANCE_COMMANDS = (
+    ["git", "multi-pack-index", "write"],
+    ["git", "commit-graph", "write", "--reachable", "--changed-paths"],
+)
+
+
+def git(repo: Path, *args: str, stdin: bytes | None = None) -> str:
+    """Run git in a repository and return stdout."""
+    result = subprocess.run(["git", *args], cwd=repo, input=stdin, capture_output=True, check=True)
+    return result.stdout.decode()
+
+
+def fast_import_stream(commits: int, fork_at: int, feature_commits: int, files: int) -> bytes:
+    """Return a fast-import stream with a long main history and a feature branch forked deep in it."""
+    lines: list[str] = []
+
+    def commit(ref: str, mark: int, parent: int | None, path: str, message: str) -> None:
+        lines.append(f"commit {ref}")
+        lines.append(f"mark :{mark}")
+        lines.append(f"committer Bench <bench@example.local> {1_600_000_000 + mark} +0000")
+        lines.append(f"data {len(message)}")
+        lines.append(message)
+        if parent is not None:
+            lines.append(f"from :{parent}")
+        lines.append(f"M 100644 inline {path}")
+        lines.append(f"data {len(message)}")
+        lines.append(message)
+
+    for index in range(1, commits + 1):
+        parent = index - 1 if index > 1 else None
+        commit("refs/heads/main", index, parent, f"src/file-{index % files}.txt", f"main {index}")
+
+    for index in range(1, feature_commits + 1):
+        mark = commits + index
+        parent = fork_at if index == 1 else mark - 1
+        commit("refs/heads/feature", mark, parent, f"feature/file-{index}.txt", f"feature {index}")
+
+    return ("\n".join(lines) + "\n").encode()
+
+
+def timed_merge_base(repo: Path, repeat: int) -> tuple[float, str]:
+    """Return the best of several merge-base timings and the merge base."""
+    best = float("inf")
+    merge_base = ""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        merge_base = git(repo, "merge-base", "main", "feature").strip()
+        best = min(best, time.perf_counter() - started)
+    return best, merge_base
+
+
+def main() -> int:
+    """Build the synthetic repository, run the benchmark, and print timings."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--commits", type=int, default=100_000)
+    parser.add_argument("--fork-at", type=int, default=1_000)
+    parser.add_argument("--feature-commits", type=int, default=20)
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="git-merge-base-bench-") as directory:
+        repo = Path(directory)
+        git(repo, "init", "--quiet", "--initial-branch", "main")
+        started = time.perf_counter()
+        git(
+            repo,
+            "fast-import",
+            "--quiet",
+            stdin=fast_import_stream(args.commits, args.fork_at, args.feature_commits, args.files),
+        )
+        print(f"commits: {args.commits + args.feature_commits}  fork point: main~{args.commits - args.fork_at}")
+        print(f"fixture build: {time.perf_counter() - started:.2f}s")
+
+        without_seconds, without_base = timed_merge_base(repo, args.repeat)
+
+        started = time.perf_counter()
+        for command in MAINTENANCE_COMMANDS:
+            subprocess.run(command, cwd=repo, capture_output=True, check=True)
+        maintenance_seconds = time.perf_counter() - started
+
+        with_seconds, with_base = timed_merge_base(repo, args.repeat)
+        if without_base != with_base:
+            print("merge bases disagree with and without maintenance", file=sys.stderr)
+            return 1
+
+    print(f"maintenance: {maintenance_seconds:.2f}s")
+    print(f"merge-base without commit-graph: {without_seconds * 1000:.1f}ms")
+    print(f"merge-base with commit-graph:    {with_seconds * 1000:.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Compare linear and trie-based changed-file to component attribution."""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import random
+import sys
+import time
+from pathlib import Path
+
+PATHS_MODULE = Path(__file__).resolve().parents[1] / "src" / "git" / "paths.py"
+
+
+def load_paths_module():
+    """Load git/paths.py without importing the Dagger module package."""
+    spec = importlib.util.spec_from_file_location("git_paths", PATHS_MODULE)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic_paths(components: int, files: int, seed: int) -> tuple[list[str], list[str]]:
+    """Return synthetic component roots and changed files spread across them."""
+    rng = random.Random(seed)
+    kinds = ("services", "packages")
+    roots = [f"{kinds[index % 2]}/group-{index % 40}/component-{index}" for index in range(components)]
+    changed_files = []
+    for index in range(files):
+        if index % 10 == 0:
+            changed_files.append(f"docs/section-{index % 50}/page-{index}.md")
+            continue
+        root = rng.choice(roots)
+        depth = rng.randint(0, 4)
+        nested = "/".join(f"dir-{rng.randint(0, 9)}" for _ in range(depth))
+        changed_files.append(f"{root}/{nested}/file-{index}.py" if nested else f"{root}/file-{index}.py")
+    return roots, changed_files
+
+
+def linear_components(changed_files: list[str], roots: list[str]) -> list[str]:
+    """Return changed components with the previous component x file scan."""
+    return sorted(root for root in roots if any(path.startswith(f"{root}/") for path in changed_files))
+
+
+def trie_components(paths_module, changed_files: list[str], roots: list[str]) -> list[str]:
+    """Return changed components with one trie walk per changed file."""
+    trie = paths_module.PathTrie(roots)
+    components: set[str] = set()
+    for path in changed_files:
+        components.update(trie.matching_dirs(path))
+    return sorted(components)
+
+
+def timed(callback) -> tuple[float, list[str]]:
+    """Return elapsed seconds and the callback result."""
+    started = time.perf_counter()
+    result = callback()
+    return time.perf_counter() - started, result
+
+
+def main() -> int:
+    """Run the benchmark and print timings."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--components", type=int, default=2000)
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    paths_module = load_paths_module()
+    roots, changed_files = synthetic_paths(args.components, args.files, args.seed)
+
+    linear_seconds, linear_result = timed(lambda: linear_components(changed_files, roots))
+    trie_seconds, trie_result = timed(lambda: trie_components(paths_module, changed_files, roots))
+    if linear_result != trie_result:
+        print("trie and linear attribution disagree", file=sys.stderr)
+        return 1
+
+    print(f"components: {len(roots)}  changed files: {len(changed_files)}  changed components: {len(trie_result)}")
+    print(f"linear scan: {linear_seconds:.3f}s")
+    print(f"path trie:   {trie_seconds:.3f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
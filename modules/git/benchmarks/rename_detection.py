@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Compare name-status diff latency across Git.get_change_set() rename detection modes."""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from git.diffs import RENAME_DETECTION_OPTIONS, rename_detection_options  # noqa: E402
+
+# Git prints these when diff.renameLimit makes it skip inexact rename or copy detection.
+SKIPPED_DETECTION_WARNINGS = ("rename detection was skipped", "only found copies from modified paths")
+
+
+def git(repo: Path, *args: str, stdin: bytes | None = None) -> str:
+    """Run git in a repository and return stdout."""
+    return run_git(repo, *args, stdin=stdin)[0]
+
+
+def run_git(repo: Path, *args: str, stdin: bytes | None = None) -> tuple[str, str]:
+    """Run git in a repository and return stdout and stderr."""
+    result = subprocess.run(["git", *args], cwd=repo, input=stdin, capture_output=True, check=True)
+    return result.stdout.decode(), result.stderr.decode()
+
+
+def file_contents(index: int, revision: str = "") -> str:
+    """Return distinct multi-line contents so similarity scoring has real work to do."""
+    lines = [f"module {index} line {line} {index * 7919 + line}" for line in range(20)]
+    if revision:
+        lines[0] = f"module {index} {revision}"
+    return "\n".join(lines) + "\n"
+
+
+def fast_import_stream(files: int, moved: int, copied: int) -> bytes:
+    """Return a fast-import stream with a base tree and a refactor commit that moves and copies files."""
+    lines: list[str] = []
+
+    def commit(mark: int, parent: int | None, message: str, changes: list[tuple[str, str | None]]) -> None:
+        lines.append("commit refs/heads/main")
+        lines.append(f"mark :{mark}")
+        lines.append(f"committer Bench <bench@example.local> {1_600_000_000 + mark} +0000")
+        lines.append(f"data {len(message)}")
+        lines.append(message)
+        if parent is not None:
+            lines.append(f"from :{parent}")
+        for path, contents in changes:
+            if contents is None:
+                lines.append(f"D {path}")
+                continue
+            lines.append(f"M 100644 inline {path}")
+            lines.append(f"data {len(contents.encode())}")
+            lines.append(contents)
+
+    base = [(f"src/pkg-{index % 100}/file-{index}.txt", file_contents(index)) for index in range(files)]
+    commit(1, None, "base", base)
+
+    refactor: list[tuple[str, str | None]] = []
+    for index in range(moved):
+        refactor.append((f"src/pkg-{index % 100}/file-{index}.txt", None))
+        refactor.append((f"lib/pkg-{index % 100}/file-{index}.txt", file_contents(index, "moved")))
+    for index in range(moved, moved + copied):
+        refactor.append((f"vendor/pkg-{index % 100}/file-{index}.txt", file_contents(index, "copied")))
+    commit(2, 1, "refactor", refactor)
+
+    return ("\n".join(lines) + "\n").encode()
+
+
+def expected_counts(mode: str, moved: int, copied: int) -> dict[str, int]:
+    """Return the status letter counts each rename_detection mode must report for the refactor commit."""
+    counts = {
+        "off": {"A": moved + copied, "D": moved},
+        "renames": {"A": copied, "R": moved},
+        "copies": {"A": copied, "R": moved},
+        "copies-harder": {"C": copied, "R": moved},
+    }[mode]
+    return {status: count for status, count in counts.items() if count}
+
+
+def timed_diff(repo: Path, options: list[str], repeat: int) -> tuple[float, dict[str, int]]:
+    """Return the best of several diff timings and the count of each status letter.
+
+    Fails when Git skipped inexact detection, since the timing would then measure the rename limit being hit.
+    """
+    best = float("inf")
+    output = ""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output, errors = run_git(repo, "diff", "--name-status", "-z", *options, "main~1", "main")
+        best = min(best, time.perf_counter() - started)
+        if any(warning in errors for warning in SKIPPED_DETECTION_WARNINGS):
+            msg = f"git diff {' '.join(options)} skipped inexact detection; raise --rename-limit:\n{errors.strip()}"
+            raise SystemExit(msg)
+
+    counts: dict[str, int] = {}
+    fields = iter(output.split("\0"))
+    for status in fields:
+        if not status:
+            continue
+        counts[status[0]] = counts.get(status[0], 0) + 1
+        if status[0] in "RC":
+            next(fields)
+        next(fields)
+    return best, counts
+
+
+def main() -> int:
+    """Build the synthetic repository, run the benchmark, and print timings."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=20_000)
+    parser.add_argument("--moved", type=int, default=200)
+    parser.add_argument("--copied", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--rename-limit", type=int, default=0, help="Candidate limit passed as -l; 0 removes it")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="git-rename-detection-bench-") as directory:
+        repo = Path(directory)
+        git(repo, "init", "--quiet", "--initial-branch", "main")
+        started = time.perf_counter()
+        git(repo, "fast-import", "--quiet", stdin=fast_import_stream(args.files, args.moved, args.copied))
+        print(f"files: {args.files}  moved: {args.moved}  copied: {args.copied}")
+        print(f"fixture build: {time.perf_counter() - started:.2f}s")
+
+        failed = False
+        for mode in RENAME_DETECTION_OPTIONS:
+            seconds, counts = timed_diff(repo, rename_detection_options(mode, args.rename_limit), args.repeat)
+            statuses = " ".join(f"{status}={count}" for status, count in sorted(counts.items()))
+            print(f"{mode:<14} {seconds * 1000:>9.1f}ms  {statuses}")
+            expected = expected_counts(mode, args.moved, args.copied)
+            if counts != expected:
+                expected_statuses = " ".join(f"{status}={count}" for status, count in sorted(expected.items()))
+                print(f"{mode}: expected {expected_statuses}", file=sys.stderr)
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
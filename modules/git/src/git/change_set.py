@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import dagger
+from dagger import function, object_type
+
+from .components import ComponentGraph, discover_components, get_changed_component_roots, load_component_graph
+from .paths import PathTrie, changed_dir_for_file, parse_pathspecs, pathspec_scopes, pathspecs_match
+
+DEFAULT_DIFF_FILTER = "ACMRTUXB"
+
+
+@object_type
+class GitChangeSet:
+    """Name-status diff between two refs computed by one Git exec."""
+
+    container_: dagger.Container
+    base_ref_: str
+    head_ref_: str
+    statuses_: list[str]
+    paths_: list[str]
+    source_paths_: list[str]
+
+    @function
+    def get_base_ref(self) -> str:
+        """Return the base ref the change set was computed from."""
+        return self.base_ref_
+
+    @function
+    def get_head_ref(self) -> str:
+        """Return the head ref the change set was computed from."""
+        return self.head_ref_
+
+    @function
+    def get_name_status(self) -> list[str]:
+        """Return tab-separated name-status records, with rename and copy sources before destinations."""
+        return [
+            "\t".join([status, source_path, path] if source_path else [status, path])
+            for status, path, source_path in zip(self.statuses_, self.paths_, self.source_paths_, strict=True)
+        ]
+
+    @function
+    def get_renames(self) -> list[str]:
+        """Return renamed and copied files as tab-separated source and destination paths."""
+        return [
+            f"{source_path}\t{path}"
+            for path, source_path in zip(self.paths_, self.source_paths_, strict=True)
+            if source_path
+        ]
+
+    @function
+    def get_files(
+        self,
+        paths: list[str] | None = None,
+        diff_filter: str = DEFAULT_DIFF_FILTER,
+    ) -> list[str]:
+        """Return changed file paths matching git pathspecs and diff-filter status letters."""
+        pathspecs = parse_pathspecs(paths)
+        return [
+            path
+            for status, path in zip(self.statuses_, self.paths_, strict=True)
+            if status_matches_diff_filter(status, diff_filter) and pathspecs_match(path, pathspecs)
+        ]
+
+    @function
+    def get_dirs(
+        self,
+        paths: list[str] | None = None,
+        depth: int = 1,
+        diff_filter: str = DEFAULT_DIFF_FILTER,
+    ) -> list[str]:
+        """Return unique changed directories."""
+        changed_files = self.get_files(paths=paths, diff_filter=diff_filter)
+        scopes = pathspec_scopes(parse_pathspecs(paths))
+        return sorted({changed_dir_for_file(path, scopes=scopes, depth=depth) for path in changed_files})
+
+    @function
+    def has_changes(
+        self,
+        paths: list[str] | None = None,
+        diff_filter: str = DEFAULT_DIFF_FILTER,
+    ) -> bool:
+        """Return whether any files changed."""
+        return bool(self.get_files(paths=paths, diff_filter=diff_filter))
+
+    @function
+    async def get_components(
+        self,
+        component_roots: list[str],
+        shared_paths: list[str] | None = None,
+        single_component: bool | None = False,
+    ) -> list[str]:
+        """Return discovered components whose files changed.
+
+        Direct component hits are resolved from the change set alone; only a shared
+        path change lists the repository to return every discovered component.
+        """
+        changed_files = self.get_files()
+
+        if single_component:
+            matching_paths = PathTrie([*component_roots, *(shared_paths or [])])
+            if any(matching_paths.has_match(path) for path in changed_files):
+                return ["."]
+            return []
+
+        shared_path_trie = PathTrie(shared_paths or [])
+        if any(shared_path_trie.has_match(path) for path in changed_files):
+            return await discover_components(self.container_, component_roots=component_roots)
+
+        return get_changed_component_roots(changed_files=changed_files, component_roots=component_roots)
+
+    @function
+    async def get_affected_components(
+        self,
+        component_roots: list[str],
+        dependency_manifest: dagger.File | None = None,
+        shared_paths: list[str] | None = None,
+    ) -> list[str]:
+        """Return changed components and their transitive dependents as tab-separated component and reason records.
+
+        Components come in dependency order, so every component follows the
+        components it depends on. A dependency manifest maps component roots to a
+        depends_on list, or to an object with depends_on and paths lists.
+        """
+        changed_files = self.get_files()
+        graph = (
+            load_component_graph(await dependency_manifest.contents())
+            if dependency_manifest
+            else ComponentGraph(dependencies={}, declared_paths={})
+        )
+
+        shared_path_trie = PathTrie(shared_paths or [])
+        if any(shared_path_trie.has_match(path) for path in changed_files):
+            components = await discover_components(self.container_, component_roots=component_roots)
+            reasons = dict.fromkeys(components, "shared path")
+        else:
+            reasons = {
+                component: f"declared path {match}"
+                for component, match in graph.get_declared_path_hits(changed_files).items()
+            }
+            reasons.update(
+                dict.fromkeys(
+                    get_changed_component_roots(changed_files=changed_files, component_roots=component_roots),
+                    "changed",
+                )
+            )
+
+        reasons = graph.expand(reasons)
+        return [f"{component}\t{reasons[component]}" for component in graph.topological_order(set(reasons))]
+
+
+def parse_name_status(output: str) -> tuple[list[str], list[str], list[str]]:
+    statuses: list[str] = []
+    paths: list[str] = []
+    source_paths: list[str] = []
+
+    fields = iter(output.split("\0"))
+    for status in fields:
+        if not status:
+            continue
+        statuses.append(status)
+        if status[0] in "RC":
+            source_paths.append(next(fields))
+        else:
+            source_paths.append("")
+        paths.append(next(fields))
+
+    return statuses, paths, source_paths
+
+
+def status_matches_diff_filter(status: str, diff_filter: str) -> bool:
+    letter = status[:1]
+    included = {char for char in diff_filter if char.isupper()}
+    excluded = {char.upper() for char in diff_filter if char.islower()}
+    if letter in excluded:
+        return False
+    return not included or letter in included
@@ -3,6 +3,20 @@ from __future__ import annotations
 import dagger
 from dagger import dag
 
+SETUP_SCRIPT = """set -e
+getent passwd "$USER_ID" >/dev/null 2>&1 ||
+  printf '%s:x:%s:%s:%s:%s:/sbin/nologin\\n' "$USER_NAME" "$USER_ID" "$USER_ID" "$USER_NAME" "$HOME" >> /etc/passwd
+getent group "$USER_ID" >/dev/null 2>&1 || printf '%s:x:%s:\\n' "$USER_NAME" "$USER_ID" >> /etc/group
+install -d -m 700 -o "$USER_ID" -g "$USER_ID" "$HOME"
+install -d -o "$USER_ID" -g "$USER_ID" "$(dirname "$GIT_REPO_PATH")"
+install -d -m 770 -o "$USER_ID" -g "$USER_ID" "$GIT_REPO_PATH"
+git config --system --add safe.directory "$GIT_REPO_PATH"
+"""
+GIT_REPO_PATH = "/tmp/git/repo"
+CHECK_REPO_SCRIPT = (
+    'git rev-parse --git-dir >/dev/null 2>&1 || (echo "Path $GIT_REPO_PATH is not a git repo" >&2; exit 1)'
+)
+
 
 class GitCli:
     """Internal Git CLI container state."""
@@ -15,6 +29,9 @@ class GitCli:
         image_tag: str,
         user_id: str,
         container_: dagger.Container | None = None,
+        merge_bases: dict[tuple[str, str], str] | None = None,
+        git_dir_only: bool | None = False,
+        lfs_skip_smudge: bool | None = True,
     ) -> None:
         self.source = source
         self.image_registry = image_registry
@@ -22,48 +39,48 @@ class GitCli:
         self.image_tag = image_tag
         self.user_id = user_id
         self.container_ = container_
+        self.merge_bases = merge_bases if merge_bases is not None else {}
+        self.git_dir_only = git_dir_only
+        self.lfs_skip_smudge = lfs_skip_smudge
 
     def container(self) -> dagger.Container:
-        """Create the configured Git container for a repository source."""
+        """Create the configured Git container for a repository source.
+
+        User, home, and Git config setup form one layer that does not depend on the
+        source, so changing the source only invalidates the copy and the repo check.
+        Git LFS smudging is skipped by default, so materialising a worktree leaves
+        pointer files instead of downloading large objects the queries never read.
+        """
         if self.container_:
             return self.container_
 
-        self.container_ = (
+        source = self.source.directory(".git") if self.git_dir_only else self.source
+        container = (
             dag.container()
             .from_(address=f"{self.image_registry}/{self.image_repository}:{self.image_tag}")
             .with_env_variable("USER_ID", self.user_id)
             .with_env_variable("USER_NAME", "git")
+            .with_env_variable("HOME", "/home/git")
+            .with_env_variable("GIT_REPO_PATH", GIT_REPO_PATH)
+            .with_env_variable("GIT_LFS_SKIP_SMUDGE", "1" if self.lfs_skip_smudge else "0")
             .with_user("0")
-            .with_exec(
-                [
-                    "sh",
-                    "-c",
-                    (
-                        'getent passwd "$USER_ID" >/dev/null 2>&1 || '
-                        'printf "$USER_NAME:x:%s:%s:$USER_NAME:/home/$USER_NAME:/sbin/nologin\\n" '
-                        '"$USER_ID" "$USER_ID" >> /etc/passwd; '
-                        'getent group "$USER_ID" >/dev/null 2>&1 || '
-                        'echo "$USER_NAME:x:$USER_ID:" >> /etc/group; '
-                        'install -d -m 700 -o "$USER_ID" -g "$USER_ID" '
-                        '"/home/$USER_NAME"'
-                    ),
-                ],
-                expand=True,
-            )
+            .with_exec(["sh", "-c", SETUP_SCRIPT])
             .with_user(self.user_id)
-            .with_env_variable("HOME", "/home/git")
-            .with_env_variable("GIT_REPO_PATH", "/tmp/git/repo")
-            .with_exec(["mkdir", "-p", "-m", "770", "$GIT_REPO_PATH"], expand=True)
-            .with_directory("$GIT_REPO_PATH", self.source, owner=self.user_id, expand=True)
             .with_workdir("$GIT_REPO_PATH", expand=True)
-            .with_exec(
-                [
-                    "sh",
-                    "-c",
-                    'git status --porcelain >/dev/null 2>&1 || (echo "Path $GIT_REPO_PATH is not a git repo" >&2; exit 1)',
-                ],
-                expand=True,
-            )
-            .with_exec(["git", "config", "--local", "safe.directory", "$GIT_REPO_PATH"], expand=True)
+            .with_directory("$GIT_REPO_PATH", source, owner=self.user_id, expand=True)
         )
+        if self.git_dir_only:
+            # A copied .git keeps core.bare=false, so Git would still look for a work tree around it.
+            container = container.with_exec(["git", "config", "core.bare", "true"])
+        self.container_ = container.with_exec(["sh", "-c", CHECK_REPO_SCRIPT])
         return self.container_
+
+    def objects_path(self) -> str:
+        """Return the absolute object directory of the copied source repository."""
+        return f"{GIT_REPO_PATH}/objects" if self.git_dir_only else f"{GIT_REPO_PATH}/.git/objects"
+
+    def require_worktree(self, function: str) -> None:
+        """Reject functions that read or write worktree files when only .git is mounted."""
+        if self.git_dir_only:
+            msg = f"{function} needs a worktree and cannot run with git_dir_only"
+            raise ValueError(msg)
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from dagger import function, object_type
+
+from .paths import PathTrie, iter_nul_fields
+
+COMMIT_MARKER = "\x1e"
+COMMIT_CHANGES_FORMAT = "--format=%x1e%H%x00%at%x00%s"
+
+
+@object_type
+class GitCommitChanges:
+    """Commits in a range with the component roots each one touched, collected by one git log exec."""
+
+    shas_: list[str]
+    author_times_: list[int]
+    subjects_: list[str]
+    change_commits_: list[int]
+    change_components_: list[str]
+
+    @function
+    def get_commits(self) -> list[str]:
+        """Return tab-separated SHA, author time, and subject records, newest first."""
+        return [self._record(index) for index in range(len(self.shas_))]
+
+    @function
+    def get_changes(self) -> list[str]:
+        """Return tab-separated SHA, author time, component root, and subject records for each touched component."""
+        return [
+            "\t".join([self.shas_[index], str(self.author_times_[index]), component, self.subjects_[index]])
+            for index, component in zip(self.change_commits_, self.change_components_, strict=True)
+        ]
+
+    @function
+    def get_commit_components(self, sha: str) -> list[str]:
+        """Return component roots touched by a commit SHA or unique SHA prefix."""
+        indexes = {index for index, commit in enumerate(self.shas_) if commit.startswith(sha)} if sha else set()
+        return sorted(
+            {
+                component
+                for index, component in zip(self.change_commits_, self.change_components_, strict=True)
+                if index in indexes
+            }
+        )
+
+    @function
+    def get_component_commits(self, component: str) -> list[str]:
+        """Return tab-separated SHA, author time, and subject records for commits touching a component root."""
+        return [
+            self._record(index)
+            for index, changed_component in zip(self.change_commits_, self.change_components_, strict=True)
+            if changed_component == component
+        ]
+
+    def _record(self, index: int) -> str:
+        return f"{self.shas_[index]}\t{self.author_times_[index]}\t{self.subjects_[index]}"
+
+
+def parse_commit_changes(output: str, component_roots: list[str]) -> GitCommitChanges:
+    component_trie = PathTrie(component_roots)
+    shas: list[str] = []
+    author_times: list[int] = []
+    subjects: list[str] = []
+    change_commits: list[int] = []
+    change_components: list[str] = []
+    components: set[str] = set()
+
+    def flush() -> None:
+        for component in sorted(components):
+            change_commits.append(len(shas) - 1)
+            change_components.append(component)
+        components.clear()
+
+    fields = iter_nul_fields(output)
+    for field in fields:
+        field = field.lstrip("\n")
+        if field.startswith(COMMIT_MARKER):
+            flush()
+            shas.append(field.removeprefix(COMMIT_MARKER))
+            author_times.append(int(next(fields) or 0))
+            subjects.append(next(fields))
+        elif field:
+            components.update(component_trie.matching_dirs(next(fields)))
+    flush()
+
+    return GitCommitChanges(
+        shas_=shas,
+        author_times_=author_times,
+        subjects_=subjects,
+        change_commits_=change_commits,
+        change_components_=change_components,
+    )
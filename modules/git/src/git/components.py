@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-from fnmatch import fnmatchcase
+import heapq
+from collections import deque
+from functools import lru_cache
 
 import dagger
+import yaml
+from dagger import dag
 
 from .cli import GitCli
-from .paths import normalize_path
+from .paths import PathTrie, normalize_path
 
 
 class Components:
@@ -14,109 +18,166 @@ class Components:
     def __init__(self, git: GitCli) -> None:
         self.git = git
 
-    async def get_components(self, component_roots: list[str]) -> list[str]:
-        normalized_roots = [normalize_path(root) for root in component_roots]
-        components: set[str] = set()
-
-        for root in normalized_roots:
-            if has_glob_meta(root):
-                components.update(await self._get_matching_directories(root))
-            elif await self._is_directory(root):
-                components.add(root)
-
-        return sorted(components)
-
-    async def get_changed_components(
-        self,
-        base_ref: str,
-        head_ref: str,
-        component_roots: list[str],
-        shared_paths: list[str] | None,
-        single_component: bool | None,
-    ) -> list[str]:
-        changed_files = await self._get_changed_files(base_ref=base_ref, head_ref=head_ref)
-        normalized_shared_paths = [normalize_path(path) for path in shared_paths or []]
-
-        if single_component:
-            matching_roots = [normalize_path(root) for root in component_roots]
-            matching_paths = [*matching_roots, *normalized_shared_paths]
-            if any(path_matches_root(path, root) for path in changed_files for root in matching_paths):
-                return ["."]
-            return []
-
-        components = await self.get_components(component_roots=component_roots)
-        if not components:
-            return []
-
-        if any(
-            path_matches_root(path, shared_path) for path in changed_files for shared_path in normalized_shared_paths
-        ):
-            return components
-
-        changed_components = {
-            component for component in components if any(path_matches_root(path, component) for path in changed_files)
-        }
-        return sorted(changed_components)
-
-    async def _get_matching_directories(self, pattern: str) -> list[str]:
-        output = await self.git.container().with_exec(["git", "ls-files", "-z", "--", pattern]).stdout()
-        files = [path for path in output.split("\0") if path]
-        return sorted(
-            {matching_component_root(path, pattern) for path in files if matching_component_root(path, pattern)}
-        )
-
-    async def _is_directory(self, path: str) -> bool:
-        if path == ".":
-            return True
-
-        cmd = ["sh", "-c", 'test -d "$1"', "is-directory", path]
-        try:
-            await self.git.container().with_exec(cmd).sync()
-            return True
-        except dagger.ExecError:
-            return False
-
-    async def _get_changed_files(self, base_ref: str, head_ref: str) -> list[str]:
-        cmd = [
-            "git",
-            "diff",
-            "--name-only",
-            "--find-renames",
-            "--find-copies",
-            "--find-copies-harder",
-            "--diff-filter=ACMRTUXB",
-            base_ref,
-            head_ref,
-        ]
-        output = await self.git.container().with_exec(cmd).stdout()
-        return [line.strip() for line in output.splitlines() if line.strip()]
-
-
-def has_glob_meta(pattern: str) -> bool:
-    return any(char in pattern for char in "*?[")
-
-
-def matching_component_root(path: str, pattern: str) -> str | None:
-    pattern_parts = normalize_path(pattern).split("/")
-    path_parts = normalize_path(path).split("/")
-
-    if len(path_parts) < len(pattern_parts):
-        return None
-
-    for pattern_part, path_part in zip(pattern_parts, path_parts, strict=False):
-        if has_glob_meta(pattern_part):
-            if not fnmatchcase(path_part, pattern_part):
-                return None
-            continue
-        if path_part != pattern_part:
+    async def get_components(self, component_roots: list[str], ref: str | None) -> list[str]:
+        return await discover_components(self.git.container(), component_roots=component_roots, ref=ref)
+
+    def get_source_for_paths(self, paths: list[str], shared_paths: list[str] | None) -> dagger.Directory:
+        include = source_include_patterns([*paths, *(shared_paths or [])])
+        if include is None:
+            return dag.directory().with_directory(".", self.git.source, exclude=[".git"])
+        return dag.directory().with_directory(".", self.git.source, include=include)
+
+
+async def discover_components(
+    container: dagger.Container,
+    component_roots: list[str],
+    ref: str | None = None,
+) -> list[str]:
+    directories = await list_directories(container, ref=ref)
+    return resolve_component_roots(directories, component_roots=component_roots)
+
+
+async def list_directories(container: dagger.Container, ref: str | None = None) -> set[str]:
+    if ref:
+        output = await container.with_exec(["git", "ls-tree", "-r", "-d", "-z", "--name-only", ref]).stdout()
+        return {path for path in output.split("\0") if path}
+
+    output = await container.with_exec(["git", "ls-files", "-z", "--cached"]).stdout()
+    directories: set[str] = set()
+    for path in output.split("\0"):
+        parts = path.split("/")[:-1]
+        for index in range(len(parts), 0, -1):
+            directory = "/".join(parts[:index])
+            if directory in directories:
+                break
+            directories.add(directory)
+    return directories
+
+
+def source_include_patterns(paths: list[str]) -> list[str] | None:
+    include: list[str] = []
+    for path in paths:
+        normalized_path = normalize_path(path)
+        if normalized_path == ".":
             return None
-
-    return "/".join(path_parts[: len(pattern_parts)])
-
-
-def path_matches_root(path: str, root: str) -> bool:
-    normalized_path = normalize_path(path)
-    normalized_root = normalize_path(root)
-    if normalized_root == ".":
-        return True
-    return normalized_path == normalized_root or normalized_path.startswith(f"{normalized_root}/")
+        include.extend([normalized_path, f"{normalized_path}/**"])
+    return include
+
+
+def resolve_component_roots(directories: set[str], component_roots: list[str]) -> list[str]:
+    component_trie = PathTrie(component_roots)
+    components = {directory for directory in directories if component_trie.matches(directory)}
+    if component_trie.matches("."):
+        components.add(".")
+    return sorted(components)
+
+
+def get_changed_component_roots(changed_files: list[str], component_roots: list[str]) -> list[str]:
+    component_trie = PathTrie(component_roots)
+    changed_components: set[str] = set()
+    for path in changed_files:
+        changed_components.update(component_trie.matching_dirs(path))
+    return sorted(changed_components)
+
+
+class ComponentGraph:
+    """Component dependency graph loaded from a dependency manifest.
+
+    Reverse edges are built once, and transitive dependents are memoized per
+    component so repeated expansions over the same manifest do not re-walk the graph.
+    """
+
+    def __init__(self, dependencies: dict[str, list[str]], declared_paths: dict[str, list[str]]) -> None:
+        self.dependencies = dependencies
+        self.declared_paths = {component: PathTrie(paths) for component, paths in declared_paths.items() if paths}
+        self.dependents: dict[str, list[str]] = {}
+        for component, depends_on in sorted(dependencies.items()):
+            for dependency in depends_on:
+                self.dependents.setdefault(dependency, []).append(component)
+        self._reached_from: dict[str, dict[str, str]] = {}
+
+    def get_declared_path_hits(self, changed_files: list[str]) -> dict[str, str]:
+        hits: dict[str, str] = {}
+        for component, trie in sorted(self.declared_paths.items()):
+            for path in changed_files:
+                match = trie.longest_match(path)
+                if match is not None:
+                    hits[component] = match
+                    break
+        return hits
+
+    def expand(self, reasons: dict[str, str]) -> dict[str, str]:
+        expanded = dict(reasons)
+        for component in sorted(reasons):
+            for dependent, dependency in self._transitive_dependents(component).items():
+                expanded.setdefault(dependent, f"depends on {dependency}")
+        return expanded
+
+    def topological_order(self, components: set[str]) -> list[str]:
+        in_degree = {
+            component: sum(1 for dependency in self.dependencies.get(component, []) if dependency in components)
+            for component in components
+        }
+        ready = [component for component, degree in in_degree.items() if degree == 0]
+        heapq.heapify(ready)
+        ordered: list[str] = []
+        while ready:
+            component = heapq.heappop(ready)
+            ordered.append(component)
+            for dependent in self.dependents.get(component, []):
+                if dependent in in_degree:
+                    in_degree[dependent] -= 1
+                    if in_degree[dependent] == 0:
+                        heapq.heappush(ready, dependent)
+
+        if len(ordered) != len(components):
+            cycle = sorted(component for component, degree in in_degree.items() if degree > 0)
+            msg = f"Dependency cycle between components: {', '.join(cycle)}"
+            raise ValueError(msg)
+        return ordered
+
+    def _transitive_dependents(self, component: str) -> dict[str, str]:
+        # Maps each transitive dependent to the dependency it was first reached through.
+        reached_from = self._reached_from.get(component)
+        if reached_from is not None:
+            return reached_from
+
+        reached_from = {}
+        queue = deque([component])
+        while queue:
+            current = queue.popleft()
+            for dependent in self.dependents.get(current, []):
+                if dependent != component and dependent not in reached_from:
+                    reached_from[dependent] = current
+                    queue.append(dependent)
+        self._reached_from[component] = reached_from
+        return reached_from
+
+
+@lru_cache(maxsize=8)
+def load_component_graph(manifest: str) -> ComponentGraph:
+    document = yaml.safe_load(manifest) or {}
+    if not isinstance(document, dict):
+        msg = "Invalid dependency manifest: expected a mapping of component roots"
+        raise ValueError(msg)
+
+    dependencies: dict[str, list[str]] = {}
+    declared_paths: dict[str, list[str]] = {}
+    for component, entry in document.items():
+        if isinstance(entry, dict):
+            depends_on = entry.get("depends_on") or []
+            paths = entry.get("paths") or []
+        else:
+            depends_on = entry or []
+            paths = []
+        if not is_string_list(depends_on) or not is_string_list(paths):
+            msg = f"Invalid dependency manifest entry for {component}: expected lists of component roots and paths"
+            raise ValueError(msg)
+        dependencies[normalize_path(str(component))] = [normalize_path(dependency) for dependency in depends_on]
+        declared_paths[normalize_path(str(component))] = list(paths)
+
+    return ComponentGraph(dependencies=dependencies, declared_paths=declared_paths)
+
+
+def is_string_list(value: object) -> bool:
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
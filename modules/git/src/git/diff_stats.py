@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+from dagger import function, object_type
+
+from .paths import PathTrie, changed_dir_for_file, parse_pathspecs, pathspec_scopes, pathspecs_match
+
+
+@object_type
+class GitDiffStats:
+    """Per-file added and removed line counts between two refs computed by one numstat exec."""
+
+    base_ref_: str
+    head_ref_: str
+    paths_: list[str]
+    added_: list[int]
+    removed_: list[int]
+    binary_: list[bool]
+
+    @function
+    def get_base_ref(self) -> str:
+        """Return the base ref the diff stats were computed from."""
+        return self.base_ref_
+
+    @function
+    def get_head_ref(self) -> str:
+        """Return the head ref the diff stats were computed from."""
+        return self.head_ref_
+
+    @function
+    def get_file_stats(self, paths: list[str] | None = None) -> list[str]:
+        """Return tab-separated added lines, removed lines, and path records, with - counts for binary files."""
+        return [
+            "\t".join(["-", "-", path] if binary else [str(added), str(removed), path])
+            for path, added, removed, binary in self._matching(paths)
+        ]
+
+    @function
+    def get_binary_files(self, paths: list[str] | None = None) -> list[str]:
+        """Return changed binary file paths."""
+        return [path for path, _, _, binary in self._matching(paths) if binary]
+
+    @function
+    def get_added_lines(self, paths: list[str] | None = None) -> int:
+        """Return the total number of added lines in text files."""
+        return sum(added for _, added, _, _ in self._matching(paths))
+
+    @function
+    def get_removed_lines(self, paths: list[str] | None = None) -> int:
+        """Return the total number of removed lines in text files."""
+        return sum(removed for _, _, removed, _ in self._matching(paths))
+
+    @function
+    def get_changed_lines(self, paths: list[str] | None = None) -> int:
+        """Return the total number of added and removed lines in text files."""
+        return sum(added + removed for _, added, removed, _ in self._matching(paths))
+
+    @function
+    def get_dir_stats(self, paths: list[str] | None = None, depth: int = 1) -> list[str]:
+        """Return tab-separated directory, added lines, removed lines, and changed file count records."""
+        scopes = pathspec_scopes(parse_pathspecs(paths))
+        totals: dict[str, list[int]] = {}
+        for path, added, removed, _ in self._matching(paths):
+            add_totals(totals, changed_dir_for_file(path, scopes=scopes, depth=depth), added, removed)
+        return format_totals(totals)
+
+    @function
+    def get_component_stats(self, component_roots: list[str]) -> list[str]:
+        """Return tab-separated component root, added lines, removed lines, and changed file count records.
+
+        Files under nested component roots count toward every matching root.
+        """
+        component_trie = PathTrie(component_roots)
+        totals: dict[str, list[int]] = {}
+        for path, added, removed, _ in self._matching(None):
+            for component in component_trie.matching_dirs(path):
+                add_totals(totals, component, added, removed)
+        return format_totals(totals)
+
+    def _matching(self, paths: list[str] | None) -> Iterator[tuple[str, int, int, bool]]:
+        pathspecs = parse_pathspecs(paths)
+        for path, added, removed, binary in zip(self.paths_, self.added_, self.removed_, self.binary_, strict=True):
+            if pathspecs_match(path, pathspecs):
+                yield path, added, removed, binary
+
+
+def parse_numstat(output: str) -> tuple[list[str], list[int], list[int], list[bool]]:
+    paths: list[str] = []
+    added: list[int] = []
+    removed: list[int] = []
+    binary: list[bool] = []
+
+    fields = iter(output.split("\0"))
+    for record in fields:
+        if not record:
+            continue
+        added_text, removed_text, path = record.split("\t", 2)
+        if not path:
+            # Renames and copies put an empty path here, then the source and destination as separate fields.
+            next(fields)
+            path = next(fields)
+        is_binary = added_text == "-"
+        paths.append(path)
+        added.append(0 if is_binary else int(added_text))
+        removed.append(0 if is_binary else int(removed_text))
+        binary.append(is_binary)
+
+    return paths, added, removed, binary
+
+
+def add_totals(totals: dict[str, list[int]], key: str, added: int, removed: int) -> None:
+    entry = totals.setdefault(key, [0, 0, 0])
+    entry[0] += added
+    entry[1] += removed
+    entry[2] += 1
+
+
+def format_totals(totals: dict[str, list[int]]) -> list[str]:
+    return [f"{key}\t{added}\t{removed}\t{files}" for key, (added, removed, files) in sorted(totals.items())]
@@ -1,7 +1,44 @@
 from __future__ import annotations
 
+import asyncio
+
+import dagger
+
+from .change_set import GitChangeSet, parse_name_status
 from .cli import GitCli
-from .paths import changed_dir_for_file, normalize_path
+from .commit_changes import COMMIT_CHANGES_FORMAT, GitCommitChanges, parse_commit_changes
+from .diff_stats import GitDiffStats, parse_numstat
+from .paths import (
+    changed_dir_for_file,
+    iter_nul_fields,
+    normalize_path,
+    parse_pathspecs,
+    pathspec_scopes,
+    pathspecs_match,
+)
+from .refs import Refs
+
+CHANGED_PATHS_SCRIPT = """set -e
+git diff --name-only -z --diff-filter=ACMRTUXB "$1" -- "$2"
+git ls-files -z --others --exclude-standard -- "$2"
+"""
+SUBMODULE_DIFF_SCRIPT = """set -e
+cd "$1"
+old="$2"
+new="$3"
+shift 3
+if ! git cat-file -e "$old^{commit}" 2>/dev/null || ! git cat-file -e "$new^{commit}" 2>/dev/null; then
+  git fetch --quiet origin "$old" "$new"
+fi
+git diff --name-status -z "$@" "$old" "$new"
+"""
+GITLINK_MODE = "160000"
+RENAME_DETECTION_OPTIONS = {
+    "off": ["--no-renames"],
+    "renames": ["--find-renames"],
+    "copies": ["--find-copies"],
+    "copies-harder": ["--find-copies", "--find-copies-harder"],
+}
 
 
 class Diffs:
@@ -11,70 +48,142 @@ class Diffs:
         self.git = git
 
     async def get_changed_paths(self, target_branch: str, diff_path: str | None) -> list[str]:
-        diff_path = diff_path or "."
-        diff_output = (
+        self.git.require_worktree("get_changed_paths")
+        normalized_diff_path = normalize_path(diff_path or ".")
+        output = (
             await self.git.container()
-            .with_exec(
-                [
-                    "sh",
-                    "-c",
-                    f'git diff --name-only --diff-filter=ACMRTUXB {target_branch} -- "{diff_path}"',
-                ]
-            )
+            .with_exec(["sh", "-c", CHANGED_PATHS_SCRIPT, "get-changed-paths", target_branch, normalized_diff_path])
             .stdout()
         )
 
-        untracked_output = (
-            await self.git.container()
-            .with_exec(
-                [
-                    "sh",
-                    "-c",
-                    f'git ls-files --others --exclude-standard -- "{diff_path}"',
-                ]
-            )
-            .stdout()
-        )
+        prefix = "" if normalized_diff_path == "." else f"{normalized_diff_path}/"
+        top_level_paths = {path.removeprefix(prefix).split("/", 1)[0] for path in iter_nul_fields(output) if path}
+        return sorted(f"{prefix}{path}" for path in top_level_paths)
+
+    async def get_change_set(
+        self,
+        base_ref: str,
+        head_ref: str,
+        merge_base: bool | None,
+        rename_detection: str,
+        rename_limit: int | None,
+        recurse_submodules: bool | None,
+    ) -> GitChangeSet:
+        if recurse_submodules:
+            self.git.require_worktree("recurse_submodules")
+        revision_range = [f"{base_ref}...{head_ref}"] if merge_base else [base_ref, head_ref]
+        diff_options = rename_detection_options(rename_detection, rename_limit)
+        cmd = ["git", "diff", "--name-status", "-z", *diff_options, *revision_range]
+        container = self.git.container()
+        output = await container.with_exec(cmd).stdout()
+        statuses, paths, source_paths = parse_name_status(output)
 
-        raw_paths = [line.strip() for line in (diff_output + "\n" + untracked_output).splitlines() if line.strip()]
+        if recurse_submodules:
+            container, submodule_outputs = await self._get_submodule_changes(container, revision_range, diff_options)
+            statuses, paths, source_paths = merge_submodule_changes(
+                (statuses, paths, source_paths),
+                {submodule: parse_name_status(output) for submodule, output in submodule_outputs.items()},
+            )
 
-        normalized_diff_path = diff_path.rstrip("/")
-        if normalized_diff_path in (".", "./"):
-            relative_paths = raw_paths
-        else:
-            prefix = f"{normalized_diff_path}/"
-            relative_paths = [path[len(prefix) :] if path.startswith(prefix) else path for path in raw_paths]
+        return GitChangeSet(
+            container_=container,
+            base_ref_=base_ref,
+            head_ref_=head_ref,
+            statuses_=statuses,
+            paths_=paths,
+            source_paths_=source_paths,
+        )
 
-        top_level_dirs = [path.split("/", 1)[0] for path in relative_paths]
-        if normalized_diff_path in (".", "./"):
-            return sorted(set(top_level_dirs))
+    async def _get_submodule_changes(
+        self,
+        container: dagger.Container,
+        revision_range: list[str],
+        diff_options: list[str],
+    ) -> tuple[dagger.Container, dict[str, str]]:
+        raw_output = await container.with_exec(
+            ["git", "diff", "--raw", "-z", "--no-abbrev", "--no-renames", "--diff-filter=M", *revision_range]
+        ).stdout()
+        gitlinks = parse_gitlink_changes(raw_output)
+        if not gitlinks:
+            return container, {}
 
-        return sorted({f"{normalized_diff_path}/{path}" for path in top_level_dirs})
+        # Only the changed submodules are initialised; their diffs then run as independent execs in parallel.
+        paths = [path for path, _, _ in gitlinks]
+        container = container.with_exec(["git", "submodule", "update", "--init", f"--jobs={len(paths)}", "--", *paths])
+        outputs = await asyncio.gather(
+            *(
+                container.with_exec(
+                    ["sh", "-c", SUBMODULE_DIFF_SCRIPT, "get-change-set", path, old_sha, new_sha, *diff_options]
+                ).stdout()
+                for path, old_sha, new_sha in gitlinks
+            )
+        )
+        return container, {path: output for (path, _, _), output in zip(gitlinks, outputs, strict=True)}
 
-    async def get_changed_files(
+    async def get_diff_stats(
         self,
         base_ref: str,
         head_ref: str,
         paths: list[str] | None,
-        diff_filter: str,
-    ) -> list[str]:
+        merge_base: bool | None,
+        rename_detection: str,
+        rename_limit: int | None,
+    ) -> GitDiffStats:
+        revision_range = [f"{base_ref}...{head_ref}"] if merge_base else [base_ref, head_ref]
         cmd = [
             "git",
             "diff",
-            "--name-only",
-            "--find-renames",
-            "--find-copies",
-            "--find-copies-harder",
-            f"--diff-filter={diff_filter}",
-            base_ref,
-            head_ref,
+            "--numstat",
+            "-z",
+            *rename_detection_options(rename_detection, rename_limit),
+            *revision_range,
         ]
-        if paths:
-            cmd.append("--")
-            cmd.extend(paths)
+        output = await self.git.container().with_exec(cmd).stdout()
+        changed_paths, added, removed, binary = parse_numstat(output)
+        pathspecs = parse_pathspecs(paths)
+        matching = [index for index, path in enumerate(changed_paths) if pathspecs_match(path, pathspecs)]
+        return GitDiffStats(
+            base_ref_=base_ref,
+            head_ref_=head_ref,
+            paths_=[changed_paths[index] for index in matching],
+            added_=[added[index] for index in matching],
+            removed_=[removed[index] for index in matching],
+            binary_=[binary[index] for index in matching],
+        )
 
+    async def get_commit_changes(self, base_ref: str, head_ref: str, component_roots: list[str]) -> GitCommitChanges:
+        cmd = [
+            "git",
+            "log",
+            "-z",
+            "--no-renames",
+            "--name-status",
+            COMMIT_CHANGES_FORMAT,
+            f"{base_ref}..{head_ref}",
+            "--",
+        ]
         output = await self.git.container().with_exec(cmd).stdout()
-        return [line.strip() for line in output.splitlines() if line.strip()]
+        return parse_commit_changes(output, component_roots=component_roots)
+
+    async def get_changed_files(
+        self,
+        base_ref: str,
+        head_ref: str,
+        paths: list[str] | None,
+        diff_filter: str,
+        rename_detection: str,
+        rename_limit: int | None,
+        recurse_submodules: bool | None,
+    ) -> list[str]:
+        change_set = await self.get_change_set(
+            base_ref=base_ref,
+            head_ref=head_ref,
+            merge_base=False,
+            rename_detection=rename_detection,
+            rename_limit=rename_limit,
+            recurse_submodules=recurse_submodules,
+        )
+        return change_set.get_files(paths=paths, diff_filter=diff_filter)
 
     async def get_changed_files_since_merge_base(
         self,
@@ -82,14 +191,20 @@ class Diffs:
         head_ref: str,
         paths: list[str] | None,
         diff_filter: str,
+        rename_detection: str,
+        rename_limit: int | None,
+        recurse_submodules: bool | None,
     ) -> list[str]:
-        merge_base = (await self.git.container().with_exec(["git", "merge-base", base_ref, head_ref]).stdout()).strip()
+        merge_base = await Refs(self.git).get_merge_base(base_ref=base_ref, head_ref=head_ref)
 
         return await self.get_changed_files(
             base_ref=merge_base,
             head_ref=head_ref,
             paths=paths,
             diff_filter=diff_filter,
+            rename_detection=rename_detection,
+            rename_limit=rename_limit,
+            recurse_submodules=recurse_submodules,
         )
 
     async def get_changed_dirs(
@@ -99,16 +214,19 @@ class Diffs:
         paths: list[str] | None,
         depth: int,
         diff_filter: str,
+        rename_detection: str,
+        rename_limit: int | None,
+        recurse_submodules: bool | None,
     ) -> list[str]:
-        changed_files = await self.get_changed_files(
+        change_set = await self.get_change_set(
             base_ref=base_ref,
             head_ref=head_ref,
-            paths=paths,
-            diff_filter=diff_filter,
+            merge_base=False,
+            rename_detection=rename_detection,
+            rename_limit=rename_limit,
+            recurse_submodules=recurse_submodules,
         )
-        scopes = [normalize_path(path) for path in paths or [] if normalize_path(path) != "."]
-
-        return sorted({changed_dir_for_file(path, scopes=scopes, depth=depth) for path in changed_files})
+        return change_set.get_dirs(paths=paths, depth=depth, diff_filter=diff_filter)
 
     async def get_changed_dirs_since_merge_base(
         self,
@@ -117,14 +235,20 @@ class Diffs:
         paths: list[str] | None,
         depth: int,
         diff_filter: str,
+        rename_detection: str,
+        rename_limit: int | None,
+        recurse_submodules: bool | None,
     ) -> list[str]:
         changed_files = await self.get_changed_files_since_merge_base(
             base_ref=base_ref,
             head_ref=head_ref,
             paths=paths,
             diff_filter=diff_filter,
+            rename_detection=rename_detection,
+            rename_limit=rename_limit,
+            recurse_submodules=recurse_submodules,
         )
-        scopes = [normalize_path(path) for path in paths or [] if normalize_path(path) != "."]
+        scopes = pathspec_scopes(parse_pathspecs(paths))
 
         return sorted({changed_dir_for_file(path, scopes=scopes, depth=depth) for path in changed_files})
 
@@ -134,11 +258,58 @@ class Diffs:
         head_ref: str,
         paths: list[str] | None,
         diff_filter: str,
+        rename_detection: str,
+        rename_limit: int | None,
+        recurse_submodules: bool | None,
     ) -> bool:
-        changed_files = await self.get_changed_files(
+        change_set = await self.get_change_set(
             base_ref=base_ref,
             head_ref=head_ref,
-            paths=paths,
-            diff_filter=diff_filter,
+            merge_base=False,
+            rename_detection=rename_detection,
+            rename_limit=rename_limit,
+            recurse_submodules=recurse_submodules,
+        )
+        return change_set.has_changes(paths=paths, diff_filter=diff_filter)
+
+
+def rename_detection_options(rename_detection: str, rename_limit: int | None) -> list[str]:
+    if rename_detection not in RENAME_DETECTION_OPTIONS:
+        msg = f"Unsupported rename detection: {rename_detection}; expected one of {', '.join(RENAME_DETECTION_OPTIONS)}"
+        raise ValueError(msg)
+
+    options = list(RENAME_DETECTION_OPTIONS[rename_detection])
+    if rename_limit is not None and rename_detection != "off":
+        options.append(f"-l{rename_limit}")
+    return options
+
+
+def parse_gitlink_changes(output: str) -> list[tuple[str, str, str]]:
+    gitlinks: list[tuple[str, str, str]] = []
+    fields = iter_nul_fields(output)
+    for record in fields:
+        if not record:
+            continue
+        path = next(fields)
+        old_mode, new_mode, old_sha, new_sha, _ = record.lstrip(":").split(" ")
+        if old_mode == new_mode == GITLINK_MODE:
+            gitlinks.append((path, old_sha, new_sha))
+    return gitlinks
+
+
+def merge_submodule_changes(
+    changes: tuple[list[str], list[str], list[str]],
+    submodule_changes: dict[str, tuple[list[str], list[str], list[str]]],
+) -> tuple[list[str], list[str], list[str]]:
+    if not submodule_changes:
+        return changes
+
+    records = [record for record in zip(*changes, strict=True) if record[1] not in submodule_changes]
+    for submodule, (statuses, paths, source_paths) in submodule_changes.items():
+        records.extend(
+            (status, f"{submodule}/{path}", f"{submodule}/{source_path}" if source_path else "")
+            for status, path, source_path in zip(statuses, paths, source_paths, strict=True)
         )
-        return bool(changed_files)
+    records.sort(key=lambda record: record[1])
+    statuses, paths, source_paths = ([record[index] for record in records] for index in range(3))
+    return statuses, paths, source_paths
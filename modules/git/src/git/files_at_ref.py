@@ -1,7 +1,68 @@
 from __future__ import annotations
 
+import dagger
+
 from .cli import GitCli
 
+FILES_AT_REF_PATH = "/tmp/git/files-at-ref"
+FILES_AT_REF_SCRIPT = """set -e
+ref="$1"
+shift
+git rev-parse --verify --quiet "$ref^{tree}" >/dev/null || { echo "unknown ref $ref" >&2; exit 1; }
+index_path="$GIT_FILES_AT_REF_PATH.index"
+rm -rf "$GIT_FILES_AT_REF_PATH" "$index_path"
+mkdir -p "$GIT_FILES_AT_REF_PATH"
+if [ "$#" -eq 0 ]; then exit 0; fi
+# ls-tree keeps each blob's mode, so executables and symlinks survive; quoted paths stay on one line.
+git --literal-pathspecs ls-tree --full-tree "$ref" -- "$@" |
+  grep '^[0-7]* blob ' | GIT_INDEX_FILE="$index_path" git update-index --index-info
+GIT_INDEX_FILE="$index_path" git checkout-index --all --prefix="$GIT_FILES_AT_REF_PATH/"
+rm -f "$index_path"
+"""
+TREE_AT_REF_PATH = "/tmp/git/tree-at-ref"
+TREE_AT_REF_SCRIPT = """set -e
+ref="$1"
+shift
+git rev-parse --verify --quiet "$ref^{tree}" >/dev/null || { echo "unknown ref $ref" >&2; exit 1; }
+index_path="$GIT_TREE_AT_REF_PATH.index"
+rm -rf "$GIT_TREE_AT_REF_PATH" "$index_path"
+mkdir -p "$GIT_TREE_AT_REF_PATH"
+git --literal-pathspecs ls-tree -r -z --full-tree "$ref" -- "$@" |
+  GIT_INDEX_FILE="$index_path" git update-index -z --index-info
+GIT_INDEX_FILE="$index_path" git checkout-index --all --prefix="$GIT_TREE_AT_REF_PATH/"
+rm -f "$index_path"
+"""
+
+LFS_INCLUDE_SPECIAL_CHARS = ",*?[\\"
+LFS_FILES_AT_REF_SCRIPT = """set -e
+remote="$1"
+ref="$2"
+shift 2
+objects="$(git rev-parse --git-common-dir)/lfs/objects"
+lfs_oid() {
+  test -f "$1" && test ! -L "$1" && test "$(wc -c < "$1")" -lt 1024 &&
+    test "$(head -n 1 "$1")" = "version https://git-lfs.github.com/spec/v1" &&
+    sed -n 's/^oid sha256:\\([0-9a-f]\\{64\\}\\)$/\\1/p' "$1" | grep .
+}
+object_path() {
+  printf '%s/%s/%s/%s\\n' "$objects" "$(printf '%s' "$1" | cut -c1-2)" "$(printf '%s' "$1" | cut -c3-4)" "$1"
+}
+include=""
+for path in "$@"; do
+  oid="$(lfs_oid "$GIT_FILES_AT_REF_PATH/$path")" || continue
+  test -f "$(object_path "$oid")" || include="$include${include:+,}$path"
+done
+if [ -n "$include" ]; then
+  command -v git-lfs >/dev/null 2>&1 || { echo "git-lfs is required to fetch LFS objects" >&2; exit 1; }
+  git lfs fetch --include="$include" "$remote" "$ref"
+fi
+for path in "$@"; do
+  file="$GIT_FILES_AT_REF_PATH/$path"
+  oid="$(lfs_oid "$file")" || continue
+  cp "$(object_path "$oid")" "$file"
+done
+"""
+
 
 class FilesAtRef:
     """Files-at-ref operations for the Git Dagger facade."""
@@ -41,3 +102,50 @@ class FilesAtRef:
             )
             .stdout()
         )
+
+    async def has_files_at_ref(self, ref: str, paths: list[str]) -> list[str]:
+        if not paths:
+            return []
+
+        batch_input = "".join(f"{ref}:{path}\n" for path in paths)
+        output = (
+            await self.git.container()
+            .with_exec(["git", "cat-file", "--batch-check=%(objecttype)"], stdin=batch_input)
+            .stdout()
+        )
+        object_types = output.splitlines()
+        return [path for path, object_type in zip(paths, object_types, strict=True) if object_type == "blob"]
+
+    def get_files_at_ref(self, ref: str, paths: list[str]) -> dagger.Directory:
+        self.git.require_worktree("get_files_at_ref")
+        return (
+            self.git.container()
+            .with_env_variable("GIT_FILES_AT_REF_PATH", FILES_AT_REF_PATH)
+            .with_exec(["sh", "-c", FILES_AT_REF_SCRIPT, "get-files-at-ref", ref, *paths])
+            .directory(FILES_AT_REF_PATH)
+        )
+
+    def get_lfs_files_at_ref(self, ref: str, paths: list[str], remote: str) -> dagger.Directory:
+        # git lfs fetch --include takes comma-separated gitignore-style patterns, so these would widen the match.
+        unsupported = [path for path in paths if any(char in path for char in LFS_INCLUDE_SPECIAL_CHARS)]
+        if unsupported:
+            msg = f"LFS file paths cannot contain commas or glob characters ({LFS_INCLUDE_SPECIAL_CHARS}): {', '.join(unsupported)}"
+            raise ValueError(msg)
+        self.git.require_worktree("get_lfs_files_at_ref")
+
+        return (
+            self.git.container()
+            .with_env_variable("GIT_FILES_AT_REF_PATH", FILES_AT_REF_PATH)
+            .with_exec(["sh", "-c", FILES_AT_REF_SCRIPT, "get-lfs-files-at-ref", ref, *paths])
+            .with_exec(["sh", "-c", LFS_FILES_AT_REF_SCRIPT, "get-lfs-files-at-ref", remote, ref, *paths])
+            .directory(FILES_AT_REF_PATH)
+        )
+
+    def get_tree_at_ref(self, ref: str, paths: list[str] | None) -> dagger.Directory:
+        self.git.require_worktree("get_tree_at_ref")
+        return (
+            self.git.container()
+            .with_env_variable("GIT_TREE_AT_REF_PATH", TREE_AT_REF_PATH)
+            .with_exec(["sh", "-c", TREE_AT_REF_SCRIPT, "get-tree-at-ref", ref, *(paths or [])])
+            .directory(TREE_AT_REF_PATH)
+        )
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import re
+
+import dagger
+
+from .cli import GitCli
+
+OBJECT_ID_PATTERN = re.compile(r"^(?:[0-9a-f]{40}|[0-9a-f]{64})$")
+REF_NAME_PATTERN = re.compile(r"^[A-Za-z0-9._+-]+(?:/[A-Za-z0-9._+-]+)*$")
+REMOTE_SECTION_PATTERN = re.compile(r'^\[remote "(?P<name>[^"\\]+)"\]$')
+REFTABLE_HEAD = "ref: refs/heads/.invalid"
+
+
+class GitDir:
+    """Read-only ref and config queries answered from .git files without starting a container.
+
+    Every method returns None when the files cannot be parsed in process, such as
+    reftable ref storage, gitfile worktrees, or config that git would rewrite; callers
+    then fall back to the Git container.
+    """
+
+    def __init__(self, source: dagger.Directory) -> None:
+        self.source = source
+        self._packed_refs: dict[str, str] | None = None
+
+    async def get_head_ref(self) -> str | None:
+        head = await self._read(".git/HEAD")
+        if head is None or head.strip() == REFTABLE_HEAD:
+            return None
+        head = head.strip()
+        if head.startswith("ref: "):
+            ref = head.removeprefix("ref: ").strip()
+            return ref if is_ref_name(ref) else None
+        return head if OBJECT_ID_PATTERN.match(head) else None
+
+    async def get_head_sha(self) -> str | None:
+        head_ref = await self.get_head_ref()
+        if head_ref is None or OBJECT_ID_PATTERN.match(head_ref):
+            return head_ref
+        return await self.resolve_ref(head_ref)
+
+    async def resolve_ref(self, ref: str) -> str | None:
+        if not is_ref_name(ref):
+            return None
+
+        loose_ref = await self._read(f".git/{ref}")
+        if loose_ref is not None:
+            object_id = loose_ref.strip()
+            return object_id if OBJECT_ID_PATTERN.match(object_id) else None
+        return (await self._get_packed_refs()).get(ref)
+
+    async def has_ref(self, ref: str) -> bool | None:
+        if not is_ref_name(ref) or await self.get_head_ref() is None:
+            return None
+
+        loose_ref = await self._read(f".git/{ref}")
+        if loose_ref is not None:
+            return True if OBJECT_ID_PATTERN.match(loose_ref.strip()) else None
+        return ref in await self._get_packed_refs()
+
+    async def get_remote_url(self, remote: str) -> str | None:
+        config = await self._read(".git/config")
+        if config is None:
+            return None
+        return parse_remote_url(config, remote)
+
+    async def _get_packed_refs(self) -> dict[str, str]:
+        if self._packed_refs is None:
+            self._packed_refs = parse_packed_refs(await self._read(".git/packed-refs") or "")
+        return self._packed_refs
+
+    async def _read(self, path: str) -> str | None:
+        try:
+            return await self.source.file(path).contents()
+        except dagger.QueryError:
+            return None
+
+
+def source_git_dir(git: GitCli) -> GitDir | None:
+    # Once a container exists, later with_* calls may have moved refs away from the source files.
+    if git.container_ is not None:
+        return None
+    return GitDir(git.source)
+
+
+def is_ref_name(ref: str) -> bool:
+    return (
+        bool(REF_NAME_PATTERN.match(ref))
+        and ref.startswith("refs/")
+        and ".." not in ref
+        and not ref.endswith(".lock")
+        and "/." not in ref
+    )
+
+
+def parse_packed_refs(output: str) -> dict[str, str]:
+    refs: dict[str, str] = {}
+    for line in output.splitlines():
+        if not line or line.startswith(("#", "^")):
+            continue
+        object_id, _, ref = line.partition(" ")
+        if OBJECT_ID_PATTERN.match(object_id) and ref:
+            refs[ref] = object_id
+    return refs
+
+
+def parse_remote_url(config: str, remote: str) -> str | None:
+    urls: list[str] = []
+    section = ""
+    for raw_line in config.splitlines():
+        line = raw_line.strip()
+        if not line or line.startswith(("#", ";")):
+            continue
+        if line.startswith("["):
+            if line.lower().startswith(("[include", "[url")):
+                return None
+            match = REMOTE_SECTION_PATTERN.match(line)
+            section = match.group("name") if match else ""
+            continue
+        if section != remote:
+            continue
+
+        key, separator, value = line.partition("=")
+        if key.strip().lower() != "url":
+            continue
+        value = value.strip()
+        if not separator or not value or any(char in value for char in '"\\;#'):
+            return None
+        urls.append(value)
+
+    if len(urls) != 1:
+        return None
+    return urls[0]
@@ -4,12 +4,19 @@ import dagger
 from dagger import DefaultPath, Doc, function, object_type
 
 from .auth import Auth
+from .change_set import GitChangeSet
 from .cli import GitCli
+from .commit_changes import GitCommitChanges
 from .components import Components
+from .diff_stats import GitDiffStats
 from .diffs import Diffs
 from .files_at_ref import FilesAtRef
+from .maintenance import Maintenance
 from .metadata import Metadata
+from .object_cache import ObjectCache
 from .refs import Refs
+from .snapshot import GitSnapshot
+from .tag_index import GitTagIndex
 from .tags import Tags
 
 DEFAULT_IMAGE_REGISTRY = "docker.io"
@@ -27,6 +34,12 @@ class Git:
     image_tag: str
     user_id: str
     container_: dagger.Container | None
+    git_dir_only: bool | None = False
+    lfs_skip_smudge: bool | None = True
+    merge_bases_: list[str] | None = None
+    deepen_rounds_: int = 0
+    deepen_commits_: int = 0
+    fetch_stats_: list[str] | None = None
 
     def _git(self) -> GitCli:
         return GitCli(
@@ -36,6 +49,9 @@ class Git:
             image_tag=self.image_tag,
             user_id=self.user_id,
             container_=self.container_,
+            merge_bases=decode_merge_bases(self.merge_bases_),
+            git_dir_only=self.git_dir_only,
+            lfs_skip_smudge=self.lfs_skip_smudge,
         )
 
     @classmethod
@@ -46,6 +62,12 @@ class Git:
         image_repository: Annotated[str | None, Doc("Git image repositroy")] = DEFAULT_IMAGE_REPOSITORY,
         image_tag: Annotated[str | None, Doc("Git image tag")] = DEFAULT_IMAGE_TAG,
         user_id: Annotated[str | None, Doc("Git image user")] = DEFAULT_CONTAINER_USER_ID,
+        git_dir_only: Annotated[
+            bool | None, Doc("Mount only the .git directory as a bare repository for functions that skip the worktree")
+        ] = False,
+        lfs_skip_smudge: Annotated[
+            bool | None, Doc("Leave Git LFS pointer files in place instead of downloading LFS objects")
+        ] = True,
     ):
         """Constructor"""
         return cls(
@@ -55,6 +77,8 @@ class Git:
             image_tag=image_tag,
             user_id=user_id,
             container_=None,
+            git_dir_only=git_dir_only,
+            lfs_skip_smudge=lfs_skip_smudge,
         )
 
     @function
@@ -121,6 +145,26 @@ class Git:
         """Return the merge-base commit shared by two refs."""
         return await Refs(self._git()).get_merge_base(base_ref=base_ref, head_ref=head_ref)
 
+    @function
+    async def get_merge_bases(
+        self,
+        pairs: Annotated[list[str], Doc("Ref pairs in BASE...HEAD form")],
+    ) -> list[str]:
+        """Return merge-base commits for many ref pairs resolved in one exec, or empty strings when none exist."""
+        return await Refs(self._git()).get_merge_bases(pairs=parse_ref_pairs(pairs))
+
+    @function
+    async def with_merge_bases(
+        self,
+        pairs: Annotated[list[str], Doc("Ref pairs in BASE...HEAD form")],
+    ) -> Self:
+        """Resolve merge bases in one exec and cache them for later merge-base and *_since_merge_base calls."""
+        git = self._git()
+        await Refs(git).get_merge_bases(pairs=parse_ref_pairs(pairs))
+        self.container_ = git.container_
+        self.merge_bases_ = encode_merge_bases(git.merge_bases)
+        return self
+
     @function
     async def get_changed_files(
         self,
@@ -128,6 +172,13 @@ class Git:
         head_ref: Annotated[str, Doc("Head Git ref or SHA")],
         paths: Annotated[list[str] | None, Doc("Optional path filters relative to the repository root")] = None,
         diff_filter: Annotated[str, Doc("Git diff-filter status letters")] = "ACMRTUXB",
+        rename_detection: Annotated[
+            str, Doc("Rename detection mode: off, renames, copies, or copies-harder")
+        ] = "renames",
+        rename_limit: Annotated[int | None, Doc("Maximum rename and copy candidates; Git's default when unset")] = None,
+        recurse_submodules: Annotated[
+            bool | None, Doc("Diff inside changed submodules and report their files with superproject paths")
+        ] = False,
     ) -> list[str]:
         """Return changed file paths between two refs."""
         return await Diffs(self._git()).get_changed_files(
@@ -135,6 +186,9 @@ class Git:
             head_ref=head_ref,
             paths=paths,
             diff_filter=diff_filter,
+            rename_detection=rename_detection,
+            rename_limit=rename_limit,
+            recurse_submodules=recurse_submodules,
         )
 
     @function
@@ -144,6 +198,13 @@ class Git:
         head_ref: Annotated[str, Doc("Head Git ref or SHA")] = "HEAD",
         paths: Annotated[list[str] | None, Doc("Optional path filters relative to the repository root")] = None,
         diff_filter: Annotated[str, Doc("Git diff-filter status letters")] = "ACMRTUXB",
+        rename_detection: Annotated[
+            str, Doc("Rename detection mode: off, renames, copies, or copies-harder")
+        ] = "renames",
+        rename_limit: Annotated[int | None, Doc("Maximum rename and copy candidates; Git's default when unset")] = None,
+        recurse_submodules: Annotated[
+            bool | None, Doc("Diff inside changed submodules and report their files with superproject paths")
+        ] = False,
     ) -> list[str]:
         """Return changed file paths from the merge base of base_ref and head_ref to head_ref."""
         return await Diffs(self._git()).get_changed_files_since_merge_base(
@@ -151,6 +212,9 @@ class Git:
             head_ref=head_ref,
             paths=paths,
             diff_filter=diff_filter,
+            rename_detection=rename_detection,
+            rename_limit=rename_limit,
+            recurse_submodules=recurse_submodules,
         )
 
     @function
@@ -161,6 +225,13 @@ class Git:
         paths: Annotated[list[str] | None, Doc("Optional path filters relative to the repository root")] = None,
         depth: Annotated[int, Doc("Directory depth to return")] = 1,
         diff_filter: Annotated[str, Doc("Git diff-filter status letters")] = "ACMRTUXB",
+        rename_detection: Annotated[
+            str, Doc("Rename detection mode: off, renames, copies, or copies-harder")
+        ] = "renames",
+        rename_limit: Annotated[int | None, Doc("Maximum rename and copy candidates; Git's default when unset")] = None,
+        recurse_submodules: Annotated[
+            bool | None, Doc("Diff inside changed submodules and report their files with superproject paths")
+        ] = False,
     ) -> list[str]:
         """Return unique changed directories between two refs."""
         return await Diffs(self._git()).get_changed_dirs(
@@ -169,6 +240,9 @@ class Git:
             paths=paths,
             depth=depth,
             diff_filter=diff_filter,
+            rename_detection=rename_detection,
+            rename_limit=rename_limit,
+            recurse_submodules=recurse_submodules,
         )
 
     @function
@@ -179,6 +253,13 @@ class Git:
         paths: Annotated[list[str] | None, Doc("Optional path filters relative to the repository root")] = None,
         depth: Annotated[int, Doc("Directory depth to return")] = 1,
         diff_filter: Annotated[str, Doc("Git diff-filter status letters")] = "ACMRTUXB",
+        rename_detection: Annotated[
+            str, Doc("Rename detection mode: off, renames, copies, or copies-harder")
+        ] = "renames",
+        rename_limit: Annotated[int | None, Doc("Maximum rename and copy candidates; Git's default when unset")] = None,
+        recurse_submodules: Annotated[
+            bool | None, Doc("Diff inside changed submodules and report their files with superproject paths")
+        ] = False,
     ) -> list[str]:
         """Return unique changed directories from the merge base of base_ref and head_ref to head_ref."""
         return await Diffs(self._git()).get_changed_dirs_since_merge_base(
@@ -187,6 +268,9 @@ class Git:
             paths=paths,
             depth=depth,
             diff_filter=diff_filter,
+            rename_detection=rename_detection,
+            rename_limit=rename_limit,
+            recurse_submodules=recurse_submodules,
         )
 
     @function
@@ -196,6 +280,13 @@ class Git:
         head_ref: Annotated[str, Doc("Head Git ref or SHA")],
         paths: Annotated[list[str] | None, Doc("Optional path filters relative to the repository root")] = None,
         diff_filter: Annotated[str, Doc("Git diff-filter status letters")] = "ACMRTUXB",
+        rename_detection: Annotated[
+            str, Doc("Rename detection mode: off, renames, copies, or copies-harder")
+        ] = "renames",
+        rename_limit: Annotated[int | None, Doc("Maximum rename and copy candidates; Git's default when unset")] = None,
+        recurse_submodules: Annotated[
+            bool | None, Doc("Diff inside changed submodules and report their files with superproject paths")
+        ] = False,
     ) -> bool:
         """Return whether any files changed between two refs."""
         return await Diffs(self._git()).has_changes(
@@ -203,15 +294,74 @@ class Git:
             head_ref=head_ref,
             paths=paths,
             diff_filter=diff_filter,
+            rename_detection=rename_detection,
+            rename_limit=rename_limit,
+            recurse_submodules=recurse_submodules,
+        )
+
+    @function
+    async def get_change_set(
+        self,
+        base_ref: Annotated[str, Doc("Base Git ref or SHA")],
+        head_ref: Annotated[str, Doc("Head Git ref or SHA")] = "HEAD",
+        merge_base: Annotated[bool | None, Doc("Diff from the merge base of base_ref and head_ref")] = False,
+        rename_detection: Annotated[
+            str, Doc("Rename detection mode: off, renames, copies, or copies-harder")
+        ] = "renames",
+        rename_limit: Annotated[int | None, Doc("Maximum rename and copy candidates; Git's default when unset")] = None,
+        recurse_submodules: Annotated[
+            bool | None, Doc("Diff inside changed submodules and report their files with superproject paths")
+        ] = False,
+    ) -> GitChangeSet:
+        """Return a reusable change set computed by one name-status diff between two refs."""
+        return await Diffs(self._git()).get_change_set(
+            base_ref=base_ref,
+            head_ref=head_ref,
+            merge_base=merge_base,
+            rename_detection=rename_detection,
+            rename_limit=rename_limit,
+            recurse_submodules=recurse_submodules,
+        )
+
+    @function
+    async def get_diff_stats(
+        self,
+        base_ref: Annotated[str, Doc("Base Git ref or SHA")],
+        head_ref: Annotated[str, Doc("Head Git ref or SHA")] = "HEAD",
+        paths: Annotated[list[str] | None, Doc("Optional path filters relative to the repository root")] = None,
+        merge_base: Annotated[bool | None, Doc("Diff from the merge base of base_ref and head_ref")] = False,
+        rename_detection: Annotated[
+            str, Doc("Rename detection mode: off, renames, copies, or copies-harder")
+        ] = "renames",
+        rename_limit: Annotated[int | None, Doc("Maximum rename and copy candidates; Git's default when unset")] = None,
+    ) -> GitDiffStats:
+        """Return per-file line counts computed by one numstat diff between two refs."""
+        return await Diffs(self._git()).get_diff_stats(
+            base_ref=base_ref,
+            head_ref=head_ref,
+            paths=paths,
+            merge_base=merge_base,
+            rename_detection=rename_detection,
+            rename_limit=rename_limit,
         )
 
     @function
     async def get_components(
         self,
         component_roots: Annotated[list[str], Doc("Component root directories or glob-like patterns")],
+        ref: Annotated[str | None, Doc("Optional Git ref to resolve components at instead of the worktree")] = None,
     ) -> list[str]:
         """Return discovered component roots in stable sorted order."""
-        return await Components(self._git()).get_components(component_roots=component_roots)
+        return await Components(self._git()).get_components(component_roots=component_roots, ref=ref)
+
+    @function
+    def get_source_for_paths(
+        self,
+        paths: Annotated[list[str], Doc("Component roots or paths to keep, relative to the repository root")],
+        shared_paths: Annotated[list[str] | None, Doc("Shared paths to keep alongside the selected paths")] = None,
+    ) -> dagger.Directory:
+        """Return a source directory containing only the selected paths and shared paths, without the .git directory."""
+        return Components(self._git()).get_source_for_paths(paths=paths, shared_paths=shared_paths)
 
     @function
     async def get_changed_components(
@@ -221,24 +371,97 @@ class Git:
         component_roots: Annotated[list[str], Doc("Component root directories or glob-like patterns")],
         shared_paths: Annotated[list[str] | None, Doc("Paths that affect all components")] = None,
         single_component: Annotated[bool | None, Doc("Treat repository as one component")] = False,
+        rename_detection: Annotated[
+            str, Doc("Rename detection mode: off, renames, copies, or copies-harder")
+        ] = "renames",
+        rename_limit: Annotated[int | None, Doc("Maximum rename and copy candidates; Git's default when unset")] = None,
+        recurse_submodules: Annotated[
+            bool | None, Doc("Diff inside changed submodules and report their files with superproject paths")
+        ] = False,
     ) -> list[str]:
         """Return discovered components whose files changed between two refs."""
-        return await Components(self._git()).get_changed_components(
+        change_set = await Diffs(self._git()).get_change_set(
             base_ref=base_ref,
             head_ref=head_ref,
+            merge_base=False,
+            rename_detection=rename_detection,
+            rename_limit=rename_limit,
+            recurse_submodules=recurse_submodules,
+        )
+        return await change_set.get_components(
             component_roots=component_roots,
             shared_paths=shared_paths,
             single_component=single_component,
         )
 
+    @function
+    async def get_affected_components(
+        self,
+        base_ref: Annotated[str, Doc("Base Git ref or SHA")],
+        head_ref: Annotated[str, Doc("Head Git ref or SHA")],
+        component_roots: Annotated[list[str], Doc("Component root directories or glob-like patterns")],
+        dependency_manifest: Annotated[
+            dagger.File | None, Doc("YAML or JSON map of component roots to depends_on lists or declared paths")
+        ] = None,
+        shared_paths: Annotated[list[str] | None, Doc("Paths that affect all components")] = None,
+        rename_detection: Annotated[
+            str, Doc("Rename detection mode: off, renames, copies, or copies-harder")
+        ] = "renames",
+        rename_limit: Annotated[int | None, Doc("Maximum rename and copy candidates; Git's default when unset")] = None,
+        recurse_submodules: Annotated[
+            bool | None, Doc("Diff inside changed submodules and report their files with superproject paths")
+        ] = False,
+    ) -> list[str]:
+        """Return changed components and their transitive dependents in dependency order with inclusion reasons."""
+        change_set = await Diffs(self._git()).get_change_set(
+            base_ref=base_ref,
+            head_ref=head_ref,
+            merge_base=False,
+            rename_detection=rename_detection,
+            rename_limit=rename_limit,
+            recurse_submodules=recurse_submodules,
+        )
+        return await change_set.get_affected_components(
+            component_roots=component_roots,
+            dependency_manifest=dependency_manifest,
+            shared_paths=shared_paths,
+        )
+
+    @function
+    async def get_commit_changes(
+        self,
+        base_ref: Annotated[str, Doc("Base Git ref or SHA excluded from the commit range")],
+        head_ref: Annotated[str, Doc("Head Git ref or SHA")] = "HEAD",
+        component_roots: Annotated[list[str] | None, Doc("Component root directories or glob-like patterns")] = None,
+    ) -> GitCommitChanges:
+        """Return commits in base_ref..head_ref with the component roots each one touched, from one git log exec."""
+        return await Diffs(self._git()).get_commit_changes(
+            base_ref=base_ref,
+            head_ref=head_ref,
+            component_roots=component_roots or [],
+        )
+
     @function
     async def with_fetched_tags(
         self,
         remote: Annotated[str, Doc("Remote name to fetch tags from")] = "origin",
         prune: Annotated[bool | None, Doc("Prune deleted tags")] = False,
+        filter: Annotated[str | None, Doc("Partial-clone object filter, such as blob:none or tree:0")] = None,
+        negotiation_tips: Annotated[
+            list[str] | None, Doc("Only report commits reachable from these refs as already present")
+        ] = None,
     ) -> Self:
         """Fetch tags from remote."""
-        self.container_ = Tags(self._git()).with_fetched_tags(remote=remote, prune=prune).container_
+        self.container_ = (
+            Tags(self._git())
+            .with_fetched_tags(
+                remote=remote,
+                prune=prune,
+                filter=filter,
+                negotiation_tips=negotiation_tips,
+            )
+            .container_
+        )
         return self
 
     @function
@@ -248,6 +471,14 @@ class Git:
         refspecs: Annotated[list[str] | None, Doc("Optional refspecs to fetch")] = None,
         depth: Annotated[int | None, Doc("Optional shallow fetch depth")] = None,
         prune: Annotated[bool | None, Doc("Prune deleted remote-tracking refs")] = False,
+        filter: Annotated[str | None, Doc("Partial-clone object filter, such as blob:none or tree:0")] = None,
+        no_tags: Annotated[bool | None, Doc("Do not fetch tags pointing at fetched history")] = False,
+        negotiation_tips: Annotated[
+            list[str] | None, Doc("Only report commits reachable from these refs as already present")
+        ] = None,
+        refmap: Annotated[
+            list[str] | None, Doc("Refspecs mapping fetched refs to local refs; pass an empty value to skip updates")
+        ] = None,
     ) -> Self:
         """Fetch refs from remote and keep them available for later Git calls."""
         self.container_ = (
@@ -257,11 +488,64 @@ class Git:
                 refspecs=refspecs,
                 depth=depth,
                 prune=prune,
+                filter=filter,
+                no_tags=no_tags,
+                negotiation_tips=negotiation_tips,
+                refmap=refmap,
             )
             .container_
         )
         return self
 
+    @function
+    async def with_maintenance(
+        self,
+        tasks: Annotated[
+            list[str] | None, Doc("Maintenance tasks to run: multi-pack-index, commit-graph (default: both)")
+        ] = None,
+    ) -> Self:
+        """Write a multi-pack-index and a commit-graph with changed-path Bloom filters for later history queries."""
+        self.container_ = (await Maintenance(self._git()).with_maintenance(tasks=tasks)).container_
+        return self
+
+    @function
+    async def with_object_cache(
+        self,
+        key: Annotated[str, Doc("Cache volume key shared by jobs that fetch from the same remote")],
+    ) -> Self:
+        """Store fetched Git objects in a persistent cache volume, reading checkout objects as alternates."""
+        self.container_ = ObjectCache(self._git()).with_object_cache(key=key).container_
+        return self
+
+    @function
+    async def with_fetched_remotes(
+        self,
+        remotes: Annotated[list[str], Doc("Remote names to fetch from in parallel")],
+        refspecs: Annotated[
+            list[str] | None,
+            Doc("Per-remote refspecs in REMOTE=REFSPEC form that replace its configured ones; others use their config"),
+        ] = None,
+        jobs: Annotated[int, Doc("Parallel fetch jobs for remotes and submodules, passed as git fetch --jobs")] = 4,
+        prune: Annotated[bool | None, Doc("Prune deleted remote-tracking refs")] = False,
+        recurse_submodules: Annotated[bool | None, Doc("Also fetch populated submodules")] = False,
+    ) -> Self:
+        """Fetch several remotes in parallel with git fetch --multiple and record per-remote objects and duration."""
+        git = self._git()
+        self.fetch_stats_ = await Refs(git).with_fetched_remotes(
+            remotes=remotes,
+            refspecs=refspecs,
+            jobs=jobs,
+            prune=prune,
+            recurse_submodules=recurse_submodules,
+        )
+        self.container_ = git.container_
+        return self
+
+    @function
+    def get_fetch_stats(self) -> list[str]:
+        """Return tab-separated remote, received objects, and milliseconds from the last with_fetched_remotes."""
+        return self.fetch_stats_ or []
+
     @function
     async def with_unshallow(
         self,
@@ -271,6 +555,36 @@ class Git:
         self.container_ = Refs(self._git()).with_unshallow(remote=remote).container_
         return self
 
+    @function
+    async def with_merge_base_available(
+        self,
+        base_ref: Annotated[str, Doc("Base Git ref or SHA")],
+        head_ref: Annotated[str, Doc("Head Git ref or SHA")] = "HEAD",
+        remote: Annotated[str, Doc("Remote name to deepen history from")] = "origin",
+        depth: Annotated[int, Doc("Commits to deepen by in the first round; doubles every round")] = 64,
+    ) -> Self:
+        """Deepen a shallow repository geometrically until base_ref and head_ref have a merge base."""
+        git = self._git()
+        self.deepen_rounds_, self.deepen_commits_ = await Refs(git).with_merge_base_available(
+            base_ref=base_ref,
+            head_ref=head_ref,
+            remote=remote,
+            depth=depth,
+        )
+        self.container_ = git.container_
+        self.merge_bases_ = encode_merge_bases(git.merge_bases)
+        return self
+
+    @function
+    def get_deepen_rounds(self) -> int:
+        """Return how many deepen fetches the last with_merge_base_available call needed."""
+        return self.deepen_rounds_
+
+    @function
+    def get_deepen_commits(self) -> int:
+        """Return how many commits the last with_merge_base_available call fetched for its refs."""
+        return self.deepen_commits_
+
     @function
     async def ensure_ref(
         self,
@@ -296,6 +610,24 @@ class Git:
         """Return whether a tag exists in the repository."""
         return await Tags(self._git()).has_tag(tag=tag)
 
+    @function
+    async def get_remote_tags(
+        self,
+        pattern: Annotated[str, Doc("Optional tag filter pattern (glob)")] = "*",
+        remote: Annotated[str, Doc("Remote name or URL to list tags from")] = "origin",
+    ) -> list[str]:
+        """Return remote tags matching a glob pattern in version order without fetching them."""
+        return await Tags(self._git()).get_remote_tags(pattern=pattern, remote=remote)
+
+    @function
+    async def has_remote_tag(
+        self,
+        tag: Annotated[str, Doc("Tag name to check")],
+        remote: Annotated[str, Doc("Remote name or URL to check")] = "origin",
+    ) -> bool:
+        """Return whether a tag exists on the remote without fetching it."""
+        return await Tags(self._git()).has_remote_tag(tag=tag, remote=remote)
+
     @function
     async def get_latest_tag(
         self,
@@ -305,6 +637,26 @@ class Git:
         """Return the latest matching tag, or an empty string when none match."""
         return await Tags(self._git()).get_latest_tag(pattern=pattern, semver=semver)
 
+    @function
+    async def get_tag_index(
+        self,
+        pattern: Annotated[str, Doc("Optional tag filter pattern (glob)")] = "*",
+    ) -> GitTagIndex:
+        """Return an in-memory tag index built from one for-each-ref exec."""
+        return await Tags(self._git()).get_tag_index(pattern=pattern)
+
+    @function
+    async def get_snapshot(
+        self,
+        short_sha_length: Annotated[int | None, Doc("Length of the short SHA")] = 8,
+        include_status: Annotated[bool | None, Doc("Collect porcelain worktree status")] = True,
+    ) -> GitSnapshot:
+        """Return HEAD, branch, remote, shallow, and status metadata collected in one Git exec."""
+        return await Metadata(self._git()).get_snapshot(
+            short_sha_length=short_sha_length,
+            include_status=include_status,
+        )
+
     @function
     async def get_short_commit_sha(
         self,
@@ -372,6 +724,43 @@ class Git:
         """Return file contents from a Git ref."""
         return await FilesAtRef(self._git()).get_file_contents_at_ref(ref=ref, path=path)
 
+    @function
+    async def has_files_at_ref(
+        self,
+        ref: Annotated[str, Doc("Git ref or SHA to inspect")],
+        paths: Annotated[list[str], Doc("File paths relative to the repository root")],
+    ) -> list[str]:
+        """Return the subset of paths that exist as files at a Git ref, checked in one exec."""
+        return await FilesAtRef(self._git()).has_files_at_ref(ref=ref, paths=paths)
+
+    @function
+    def get_files_at_ref(
+        self,
+        ref: Annotated[str, Doc("Git ref or SHA to read from")],
+        paths: Annotated[list[str], Doc("File paths relative to the repository root")],
+    ) -> dagger.Directory:
+        """Return a directory with files from a Git ref laid out at their paths; missing paths are skipped."""
+        return FilesAtRef(self._git()).get_files_at_ref(ref=ref, paths=paths)
+
+    @function
+    def get_lfs_files_at_ref(
+        self,
+        ref: Annotated[str, Doc("Git ref or SHA to read from")],
+        paths: Annotated[list[str], Doc("File paths relative to the repository root")],
+        remote: Annotated[str | None, Doc("Remote to fetch missing LFS objects from")] = "origin",
+    ) -> dagger.Directory:
+        """Return a directory with files from a Git ref, fetching only the LFS objects of those files."""
+        return FilesAtRef(self._git()).get_lfs_files_at_ref(ref=ref, paths=paths, remote=remote)
+
+    @function
+    def get_tree_at_ref(
+        self,
+        ref: Annotated[str, Doc("Git ref or SHA to export")],
+        paths: Annotated[list[str] | None, Doc("Optional subtree paths relative to the repository root")] = None,
+    ) -> dagger.Directory:
+        """Return the tree of a Git ref, or only the requested subtrees, without checking it out."""
+        return FilesAtRef(self._git()).get_tree_at_ref(ref=ref, paths=paths)
+
     @function
     async def get_tags_pointing_at(
         self,
@@ -384,11 +773,20 @@ class Git:
     async def ensure_pushed_tag(
         self,
         tag: Annotated[str, Doc("Tag name to ensure exists on the remote")],
-        remote: Annotated[str, Doc("Remote name to fetch and push the tag against")] = "origin",
+        remote: Annotated[str, Doc("Remote name to check and push the tag against")] = "origin",
     ) -> str:
         """Return a tag after ensuring it exists on the remote."""
         return await Tags(self._git()).ensure_pushed_tag(tag=tag, remote=remote)
 
+    @function
+    async def ensure_pushed_tags(
+        self,
+        tags: Annotated[list[str], Doc("Tag names to ensure exist on the remote")],
+        remote: Annotated[str, Doc("Remote name to check and push the tags against")] = "origin",
+    ) -> list[str]:
+        """Ensure tags exist on the remote with one atomic push and return each tag with its created/existing status."""
+        return await Tags(self._git()).ensure_pushed_tags(tags=tags, remote=remote)
+
     @function
     async def create_tag(
         self,
@@ -419,3 +817,26 @@ class Git:
         """Push a local tag to a remote."""
         self.container_ = Tags(self._git()).push_tag(tag=tag, remote=remote).container_
         return self
+
+
+def parse_ref_pairs(pairs: list[str]) -> list[tuple[str, str]]:
+    ref_pairs: list[tuple[str, str]] = []
+    for pair in pairs:
+        base_ref, separator, head_ref = pair.partition("...")
+        if not separator or not base_ref or not head_ref:
+            msg = f"Ref pair must use BASE...HEAD form: {pair}"
+            raise ValueError(msg)
+        ref_pairs.append((base_ref, head_ref))
+    return ref_pairs
+
+
+def encode_merge_bases(merge_bases: dict[tuple[str, str], str]) -> list[str]:
+    return [f"{base_sha} {head_sha} {merge_base}" for (base_sha, head_sha), merge_base in merge_bases.items()]
+
+
+def decode_merge_bases(merge_bases: list[str] | None) -> dict[tuple[str, str], str]:
+    decoded: dict[tuple[str, str], str] = {}
+    for entry in merge_bases or []:
+        base_sha, head_sha, merge_base = entry.split()
+        decoded[(base_sha, head_sha)] = merge_base
+    return decoded
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from .cli import GitCli
+from .object_cache import OBJECT_CACHE_PATH
+
+MAINTENANCE_TASKS = {
+    "multi-pack-index": (
+        'set -- "$(git rev-parse --git-path objects)"/pack/*.idx; if [ -e "$1" ]; then git multi-pack-index write; fi'
+    ),
+    "commit-graph": "git commit-graph write --reachable --changed-paths",
+}
+DEFAULT_MAINTENANCE_TASKS = ["multi-pack-index", "commit-graph"]
+
+
+class Maintenance:
+    """Repository maintenance operations for the Git Dagger facade."""
+
+    def __init__(self, git: GitCli) -> None:
+        self.git = git
+
+    async def with_maintenance(self, tasks: list[str] | None) -> GitCli:
+        scripts = []
+        for task in tasks or DEFAULT_MAINTENANCE_TASKS:
+            if task not in MAINTENANCE_TASKS:
+                msg = f"Unsupported maintenance task: {task}; expected one of {', '.join(MAINTENANCE_TASKS)}"
+                raise ValueError(msg)
+            scripts.append(MAINTENANCE_TASKS[task])
+
+        # Jobs sharing an object cache only share its objects; a commit-graph or multi-pack-index written
+        # there could name commits that live in this job's checkout alone and break other jobs.
+        container = self.git.container()
+        if await container.env_variable("GIT_OBJECT_DIRECTORY") == OBJECT_CACHE_PATH:
+            msg = "with_maintenance cannot write into the shared object cache; run it before with_object_cache"
+            raise ValueError(msg)
+
+        self.git.container_ = container.with_exec(["sh", "-c", "; ".join(["set -e", *scripts])])
+        return self.git
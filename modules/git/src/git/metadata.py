@@ -1,6 +1,10 @@
 from __future__ import annotations
 
 from .cli import GitCli
+from .git_dir import source_git_dir
+from .snapshot import SNAPSHOT_SCRIPT, GitSnapshot, parse_snapshot
+
+DEFAULT_SHORT_SHA_LENGTH = 8
 
 
 class Metadata:
@@ -9,24 +13,52 @@ class Metadata:
     def __init__(self, git: GitCli) -> None:
         self.git = git
 
+    async def get_snapshot(self, short_sha_length: int | None, include_status: bool | None) -> GitSnapshot:
+        if include_status:
+            self.git.require_worktree("include_status")
+        output = (
+            await self.git.container()
+            .with_exec(
+                [
+                    "sh",
+                    "-c",
+                    SNAPSHOT_SCRIPT,
+                    "snapshot",
+                    str(short_sha_length or DEFAULT_SHORT_SHA_LENGTH),
+                    "true" if include_status else "false",
+                ]
+            )
+            .stdout()
+        )
+        return parse_snapshot(output)
+
     async def get_head_sha(self) -> str:
-        return await self.git.container().with_exec(["git", "rev-parse", "HEAD"]).stdout()
+        git_dir = source_git_dir(self.git)
+        if git_dir and (head_sha := await git_dir.get_head_sha()):
+            return head_sha
+        return (await self._get_ref_snapshot()).get_head_sha()
 
     async def get_short_commit_sha(self, length: int | None) -> str:
-        return await self.git.container().with_exec(["git", "rev-parse", f"--short={length}", "HEAD"]).stdout()
+        snapshot = await self.get_snapshot(short_sha_length=length, include_status=False)
+        return snapshot.get_short_commit_sha()
 
     async def get_current_branch(self) -> str:
-        return await self.git.container().with_exec(["git", "branch", "--show-current"]).stdout()
+        git_dir = source_git_dir(self.git)
+        if git_dir and (head_ref := await git_dir.get_head_ref()):
+            return head_ref.removeprefix("refs/heads/") if head_ref.startswith("refs/heads/") else ""
+        return (await self._get_ref_snapshot()).get_current_branch()
 
     async def get_current_ref(self) -> str:
-        return (
-            await self.git.container()
-            .with_exec(["sh", "-c", "git symbolic-ref --quiet HEAD || git rev-parse HEAD"])
-            .stdout()
-        )
+        git_dir = source_git_dir(self.git)
+        if git_dir and (head_ref := await git_dir.get_head_ref()):
+            return head_ref
+        return (await self._get_ref_snapshot()).get_current_ref()
 
     async def get_remote_url(self, remote: str) -> str:
-        return await self.git.container().with_exec(["git", "remote", "get-url", remote]).stdout()
+        git_dir = source_git_dir(self.git)
+        if git_dir and (remote_url := await git_dir.get_remote_url(remote=remote)):
+            return remote_url
+        return (await self._get_ref_snapshot()).get_remote_url(remote=remote)
 
     async def get_default_branch(self, remote: str) -> str:
         return (
@@ -44,8 +76,13 @@ class Metadata:
         )
 
     async def get_status_porcelain(self) -> str:
-        return await self.git.container().with_exec(["git", "status", "--porcelain"]).stdout()
+        snapshot = await self.get_snapshot(short_sha_length=DEFAULT_SHORT_SHA_LENGTH, include_status=True)
+        return snapshot.get_status_porcelain()
 
     async def has_clean_worktree(self) -> bool:
         status = await self.get_status_porcelain()
         return status.strip() == ""
+
+    async def _get_ref_snapshot(self) -> GitSnapshot:
+        # Ref getters share one identical exec so Dagger can reuse its cached result.
+        return await self.get_snapshot(short_sha_length=DEFAULT_SHORT_SHA_LENGTH, include_status=False)
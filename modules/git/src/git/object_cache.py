@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from dagger import dag
+
+from .cli import GitCli
+
+OBJECT_CACHE_PATH = "/tmp/git/object-cache"
+OBJECT_CACHE_SCRIPT = """set -e
+unset GIT_OBJECT_DIRECTORY GIT_ALTERNATE_OBJECT_DIRECTORIES
+mkdir -p "$1/pack" "$1/info"
+git config --local gc.auto 0
+git config --local maintenance.auto false
+"""
+
+
+class ObjectCache:
+    """Object cache operations for the Git Dagger facade."""
+
+    def __init__(self, git: GitCli) -> None:
+        self.git = git
+
+    def with_object_cache(self, key: str) -> GitCli:
+        self.git.container_ = (
+            self.git.container()
+            .with_mounted_cache(
+                OBJECT_CACHE_PATH,
+                dag.cache_volume(f"git-object-cache-{key}"),
+                owner=self.git.user_id,
+            )
+            .with_exec(["sh", "-c", OBJECT_CACHE_SCRIPT, "with-object-cache", OBJECT_CACHE_PATH])
+            .with_env_variable("GIT_ALTERNATE_OBJECT_DIRECTORIES", self.git.objects_path())
+            .with_env_variable("GIT_OBJECT_DIRECTORY", OBJECT_CACHE_PATH)
+        )
+        return self.git
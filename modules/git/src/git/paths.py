@@ -1,4 +1,76 @@
-def changed_dir_for_file(path: str, scopes: list[str], depth: int) -> str:
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Iterator
+from fnmatch import fnmatchcase
+
+PATHSPEC_MAGIC = ("exclude", "glob", "icase", "literal", "top")
+SHORT_PATHSPEC_MAGIC = {"!": "exclude", "^": "exclude", "/": "top"}
+
+
+class PathTrie:
+    """Path-segment trie over literal and glob-like path prefixes.
+
+    Lookups walk one path segment at a time, so matching a path costs its depth
+    rather than the number of stored prefixes.
+    """
+
+    __slots__ = ("children", "glob_children", "terminal")
+
+    def __init__(self, prefixes: Iterable[str] = ()) -> None:
+        self.children: dict[str, PathTrie] = {}
+        self.glob_children: dict[str, PathTrie] = {}
+        self.terminal = False
+        for prefix in prefixes:
+            self.add(prefix)
+
+    def add(self, prefix: str) -> None:
+        node = self
+        for segment in path_segments(prefix):
+            children = node.glob_children if has_glob_meta(segment) else node.children
+            child = children.get(segment)
+            if child is None:
+                child = children[segment] = PathTrie()
+            node = child
+        node.terminal = True
+
+    def longest_match(self, path: str) -> str | None:
+        segments = path_segments(path)
+        depths = list(self._matching_depths(segments))
+        if not depths:
+            return None
+        return join_segments(segments[: max(depths)])
+
+    def matching_dirs(self, path: str) -> set[str]:
+        segments = path_segments(path)
+        return {join_segments(segments[:depth]) for depth in self._matching_depths(segments) if depth < len(segments)}
+
+    def matches(self, path: str) -> bool:
+        segments = path_segments(path)
+        return any(depth == len(segments) for depth in self._matching_depths(segments))
+
+    def has_match(self, path: str) -> bool:
+        return next(self._matching_depths(path_segments(path)), None) is not None
+
+    def _matching_depths(self, segments: list[str]) -> Iterator[int]:
+        stack: list[tuple[PathTrie, int]] = [(self, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if node.terminal:
+                yield depth
+            if depth == len(segments):
+                continue
+
+            segment = segments[depth]
+            child = node.children.get(segment)
+            if child is not None:
+                stack.append((child, depth + 1))
+            for pattern, glob_child in node.glob_children.items():
+                if fnmatchcase(segment, pattern):
+                    stack.append((glob_child, depth + 1))
+
+
+def changed_dir_for_file(path: str, scopes: PathTrie, depth: int) -> str:
     normalized_path = normalize_path(path)
     if depth <= 0:
         return "."
@@ -17,11 +89,12 @@ def changed_dir_for_file(path: str, scopes: list[str], depth: int) -> str:
     return "/".join(parts[:depth])
 
 
-def matching_scope(path: str, scopes: list[str]) -> str | None:
-    matching_scopes = [scope for scope in scopes if path == scope or path.startswith(f"{scope}/")]
-    if not matching_scopes:
-        return None
-    return max(matching_scopes, key=len)
+def matching_scope(path: str, scopes: PathTrie) -> str | None:
+    return scopes.longest_match(path)
+
+
+def has_glob_meta(pattern: str) -> bool:
+    return any(char in pattern for char in "*?[")
 
 
 def normalize_path(path: str) -> str:
@@ -29,3 +102,139 @@ def normalize_path(path: str) -> str:
     if normalized in ("", "."):
         return "."
     return normalized.removeprefix("./")
+
+
+def path_segments(path: str) -> list[str]:
+    normalized_path = normalize_path(path)
+    if normalized_path == ".":
+        return []
+    return normalized_path.split("/")
+
+
+def join_segments(segments: list[str]) -> str:
+    return "/".join(segments) or "."
+
+
+class Pathspec:
+    """One git pathspec, including its exclude, glob, icase, literal, and top magic.
+
+    Change sets are filtered after the diff, so the matching follows git: the
+    pattern text matches a path exactly or as a leading directory, and a
+    wildcard pattern must otherwise match the whole path. Plain wildcards cross
+    directories, while glob magic keeps them inside one segment with **
+    spanning directories.
+    """
+
+    __slots__ = ("exclude", "icase", "pattern", "regex")
+
+    def __init__(self, pathspec: str) -> None:
+        magic, pattern = parse_pathspec_magic(pathspec)
+        if "glob" in magic and "literal" in magic:
+            msg = f"Pathspec magic glob and literal are incompatible: {pathspec}"
+            raise ValueError(msg)
+
+        self.exclude = "exclude" in magic
+        self.icase = "icase" in magic
+        self.pattern = normalize_path(pattern)
+        flags = re.IGNORECASE if self.icase else 0
+        if self.pattern == "." or "literal" in magic or not has_glob_meta(self.pattern):
+            self.regex = None
+        elif "glob" in magic:
+            self.regex = re.compile(wildmatch_regex(self.pattern), flags)
+        else:
+            self.regex = re.compile(fnmatch_regex(self.pattern), flags)
+
+    def matches(self, path: str) -> bool:
+        if self.pattern == ".":
+            return True
+        pattern, literal_path = (self.pattern.lower(), path.lower()) if self.icase else (self.pattern, path)
+        if literal_path == pattern or literal_path.startswith(f"{pattern}/"):
+            return True
+        return self.regex is not None and self.regex.fullmatch(path) is not None
+
+
+def parse_pathspecs(pathspecs: Iterable[str] | None) -> list[Pathspec]:
+    return [Pathspec(pathspec) for pathspec in pathspecs or []]
+
+
+def pathspecs_match(path: str, pathspecs: list[Pathspec]) -> bool:
+    """Return whether a path matches any included pathspec and no excluded one, like git diff -- <pathspec>."""
+    includes = [pathspec for pathspec in pathspecs if not pathspec.exclude]
+    if includes and not any(pathspec.matches(path) for pathspec in includes):
+        return False
+    return not any(pathspec.matches(path) for pathspec in pathspecs if pathspec.exclude)
+
+
+def pathspec_scopes(pathspecs: list[Pathspec]) -> PathTrie:
+    return PathTrie(pathspec.pattern for pathspec in pathspecs if not pathspec.exclude and pathspec.pattern != ".")
+
+
+def parse_pathspec_magic(pathspec: str) -> tuple[set[str], str]:
+    if not pathspec.startswith(":"):
+        return set(), pathspec
+
+    if pathspec.startswith(":("):
+        end = pathspec.find(")")
+        if end == -1:
+            msg = f"Missing ) in pathspec magic: {pathspec}"
+            raise ValueError(msg)
+        magic = {word.strip() for word in pathspec[2:end].split(",") if word.strip()}
+        unsupported = sorted(magic.difference(PATHSPEC_MAGIC))
+        if unsupported:
+            msg = f"Unsupported pathspec magic: {', '.join(unsupported)}; expected one of {', '.join(PATHSPEC_MAGIC)}"
+            raise ValueError(msg)
+        return magic, pathspec[end + 1 :]
+
+    magic = set()
+    position = 1
+    while position < len(pathspec) and pathspec[position] in SHORT_PATHSPEC_MAGIC:
+        magic.add(SHORT_PATHSPEC_MAGIC[pathspec[position]])
+        position += 1
+    if pathspec[position : position + 1] == ":":
+        position += 1
+    return magic, pathspec[position:]
+
+
+def fnmatch_regex(pattern: str) -> str:
+    return wildcard_regex(pattern, star=".*", question=".")
+
+
+def wildmatch_regex(pattern: str) -> str:
+    # ** spans directories only as a whole segment; a lone * or ? stays inside one segment.
+    parts = []
+    for index, segment in enumerate(pattern.split("/")):
+        if segment == "**":
+            parts.append("(?:.*/)?" if index < pattern.count("/") else ".*")
+        else:
+            parts.append(wildcard_regex(segment, star="[^/]*", question="[^/]") + "/")
+    return "".join(parts).removesuffix("/")
+
+
+def wildcard_regex(pattern: str, star: str, question: str) -> str:
+    parts = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "*":
+            parts.append(star)
+        elif char == "?":
+            parts.append(question)
+        elif char == "[" and (end := pattern.find("]", index + 2)) != -1:
+            body = pattern[index + 1 : end].replace("\\", "\\\\")
+            if body.startswith("!"):
+                body = f"^{body[1:]}"
+            parts.append(f"[{body}]")
+            index = end
+        else:
+            parts.append(re.escape(char))
+        index += 1
+    return "".join(parts)
+
+
+def iter_nul_fields(output: str) -> Iterator[str]:
+    start = 0
+    while (end := output.find("\0", start)) != -1:
+        yield output[start:end]
+        start = end + 1
+    if start < len(output):
+        yield output[start:]
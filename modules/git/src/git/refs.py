@@ -1,7 +1,65 @@
 from __future__ import annotations
 
+import json
+
 from .cli import GitCli
 
+MERGE_BASE_AVAILABLE_SCRIPT = """set -e
+remote="$1"
+deepen="$4"
+base_sha="$(git rev-parse --verify "$2^{commit}")"
+head_sha="$(git rev-parse --verify "$3^{commit}")"
+start_count="$(git rev-list --count "$base_sha" "$head_sha")"
+count="$start_count"
+rounds=0
+until merge_base="$(git merge-base "$base_sha" "$head_sha")"; do
+  if [ "$(git rev-parse --is-shallow-repository)" != true ]; then
+    printf 'No merge base found between %s and %s\\n' "$2" "$3" >&2
+    exit 1
+  fi
+  git fetch --deepen="$deepen" "$remote"
+  rounds=$((rounds + 1))
+  deepen=$((deepen * 2))
+  previous_count="$count"
+  count="$(git rev-list --count "$base_sha" "$head_sha")"
+  if [ "$count" = "$previous_count" ]; then
+    printf 'Deepening from %s fetched no new history for %s and %s\\n' "$remote" "$2" "$3" >&2
+    exit 1
+  fi
+done
+printf '%s %s %s %s %s\\n' "$rounds" "$((count - start_count))" "$base_sha" "$head_sha" "$merge_base"
+"""
+
+FETCH_REMOTES_SCRIPT = """set -e
+jobs="$1"
+groups="$2"
+shift 2
+config="$(git rev-parse --path-format=absolute --git-path config)"
+work_dir="$(mktemp -d)"
+cp "$config" "$work_dir/config"
+trap 'cp "$work_dir/config" "$config"; rm -rf "$work_dir"' EXIT
+# --multiple takes no refspecs, so per-remote refspecs replace the configured ones for this fetch only.
+while [ "$groups" -gt 0 ]; do
+  remote="$1"
+  count="$2"
+  shift 2
+  git config --unset-all "remote.$remote.fetch" || :
+  while [ "$count" -gt 0 ]; do
+    git config --add "remote.$remote.fetch" "$1"
+    shift
+    count=$((count - 1))
+  done
+  groups=$((groups - 1))
+done
+mkdir "$work_dir/events"
+GIT_TRACE2_EVENT="$work_dir/events" git fetch --multiple --jobs="$jobs" "$@" >&2
+# Each process writes its own trace2 file; keep the events that carry argv and exit time.
+for events in "$work_dir/events"/*; do
+  grep -e '"event":"start"' -e '"event":"child_start"' -e '"event":"exit"' "$events" || :
+  printf '\\000'
+done
+"""
+
 
 class Refs:
     """Ref and fetch operations for the Git Dagger facade."""
@@ -10,8 +68,54 @@ class Refs:
         self.git = git
 
     async def get_merge_base(self, base_ref: str, head_ref: str) -> str:
-        output = await self.git.container().with_exec(["git", "merge-base", base_ref, head_ref]).stdout()
-        return output.strip()
+        merge_base = (await self.get_merge_bases(pairs=[(base_ref, head_ref)]))[0]
+        if not merge_base:
+            msg = f"No merge base found between {base_ref} and {head_ref}"
+            raise ValueError(msg)
+        return merge_base
+
+    async def get_merge_bases(self, pairs: list[tuple[str, str]]) -> list[str]:
+        if not pairs:
+            return []
+
+        if not self.git.merge_bases:
+            resolved = await self._resolve_merge_bases(pairs)
+            self._cache_merge_bases(resolved)
+            return [merge_base for _, _, merge_base in resolved]
+
+        commit_refs = [f"{ref}^{{commit}}" for pair in pairs for ref in pair]
+        shas = (await self.git.container().with_exec(["git", "rev-parse", *commit_refs]).stdout()).split()
+        sha_pairs = list(zip(shas[0::2], shas[1::2], strict=True))
+        missing_pairs = sorted({pair for pair in sha_pairs if pair not in self.git.merge_bases})
+        if missing_pairs:
+            self._cache_merge_bases(await self._resolve_merge_bases(missing_pairs))
+        return [self.git.merge_bases.get(pair, "") for pair in sha_pairs]
+
+    async def _resolve_merge_bases(self, pairs: list[tuple[str, str]]) -> list[tuple[str, str, str]]:
+        cmd = [
+            "sh",
+            "-c",
+            (
+                "set -e; "
+                "while [ $# -gt 0 ]; do "
+                'base_sha="$(git rev-parse --verify "$1^{commit}")"; '
+                'head_sha="$(git rev-parse --verify "$2^{commit}")"; '
+                "shift 2; "
+                'merge_base="$(git merge-base "$base_sha" "$head_sha" || true)"; '
+                'printf \'%s\\000%s\\000%s\\000\' "$base_sha" "$head_sha" "$merge_base"; '
+                "done"
+            ),
+            "get-merge-bases",
+            *[ref for pair in pairs for ref in pair],
+        ]
+        output = await self.git.container().with_exec(cmd).stdout()
+        fields = output.split("\0")
+        return list(zip(fields[0::3], fields[1::3], fields[2::3], strict=False))
+
+    def _cache_merge_bases(self, resolved: list[tuple[str, str, str]]) -> None:
+        for base_sha, head_sha, merge_base in resolved:
+            if merge_base:
+                self.git.merge_bases[(base_sha, head_sha)] = merge_base
 
     async def ensure_ref(self, ref: str) -> str:
         cmd = [
@@ -30,12 +134,21 @@ class Refs:
         refspecs: list[str] | None,
         depth: int | None,
         prune: bool | None,
+        filter: str | None = None,
+        no_tags: bool | None = False,
+        negotiation_tips: list[str] | None = None,
+        refmap: list[str] | None = None,
     ) -> GitCli:
         cmd = ["git", "fetch"]
         if prune:
             cmd.append("--prune")
         if depth is not None:
             cmd.extend(["--depth", str(depth)])
+        cmd.extend(fetch_options(filter=filter, negotiation_tips=negotiation_tips))
+        if no_tags:
+            cmd.append("--no-tags")
+        if refmap is not None:
+            cmd.extend(f"--refmap={refspec}" for refspec in refmap or [""])
         cmd.append(remote)
         if refspecs:
             cmd.extend(refspecs)
@@ -43,6 +156,73 @@ class Refs:
         self.git.container_ = self.git.container().with_exec(cmd)
         return self.git
 
+    async def with_fetched_remotes(
+        self,
+        remotes: list[str],
+        refspecs: list[str] | None,
+        jobs: int,
+        prune: bool | None,
+        recurse_submodules: bool | None,
+    ) -> list[str]:
+        if jobs < 1:
+            msg = f"Fetch jobs must be positive: {jobs}"
+            raise ValueError(msg)
+        if not remotes:
+            msg = "At least one remote is required"
+            raise ValueError(msg)
+
+        remote_refspecs: dict[str, list[str]] = {remote: [] for remote in remotes}
+        for entry in refspecs or []:
+            remote, separator, refspec = entry.partition("=")
+            if not separator or not refspec or remote not in remote_refspecs:
+                msg = f"Invalid remote refspec: {entry}; expected REMOTE=REFSPEC for one of {', '.join(remotes)}"
+                raise ValueError(msg)
+            remote_refspecs[remote].append(refspec)
+
+        args = [str(jobs), str(sum(1 for refspecs_for_remote in remote_refspecs.values() if refspecs_for_remote))]
+        for remote, refspecs_for_remote in remote_refspecs.items():
+            if refspecs_for_remote:
+                args.extend([remote, str(len(refspecs_for_remote)), *refspecs_for_remote])
+        if prune:
+            args.append("--prune")
+        if recurse_submodules:
+            args.append("--recurse-submodules")
+
+        container = self.git.container().with_exec(
+            ["sh", "-c", FETCH_REMOTES_SCRIPT, "with-fetched-remotes", *args, *remote_refspecs]
+        )
+        output = await container.stdout()
+        self.git.container_ = container
+        return parse_fetch_stats(output, list(remote_refspecs))
+
+    async def with_merge_base_available(
+        self,
+        base_ref: str,
+        head_ref: str,
+        remote: str,
+        depth: int,
+    ) -> tuple[int, int]:
+        if depth < 1:
+            msg = f"Deepen depth must be positive: {depth}"
+            raise ValueError(msg)
+
+        container = self.git.container().with_exec(
+            [
+                "sh",
+                "-c",
+                MERGE_BASE_AVAILABLE_SCRIPT,
+                "with-merge-base-available",
+                remote,
+                base_ref,
+                head_ref,
+                str(depth),
+            ]
+        )
+        rounds, commits, base_sha, head_sha, merge_base = (await container.stdout()).split()
+        self.git.container_ = container
+        self.git.merge_bases[(base_sha, head_sha)] = merge_base
+        return int(rounds), int(commits)
+
     def with_unshallow(self, remote: str) -> GitCli:
         cmd = [
             "sh",
@@ -59,3 +239,34 @@ class Refs:
         ]
         self.git.container_ = self.git.container().with_exec(cmd)
         return self.git
+
+
+def fetch_options(filter: str | None, negotiation_tips: list[str] | None) -> list[str]:
+    options: list[str] = []
+    if filter:
+        options.append(f"--filter={filter}")
+    options.extend(f"--negotiation-tip={tip}" for tip in negotiation_tips or [])
+    return options
+
+
+def parse_fetch_stats(output: str, remotes: list[str]) -> list[str]:
+    # Each remote is fetched by a child "git fetch --append ... <remote>". Its trace2 events hold the
+    # --pack_header=2,<objects> of every index-pack or unpack-objects it starts, and its exit time.
+    stats: dict[str, tuple[int, int]] = {}
+    for process in output.split("\0"):
+        events = [json.loads(line) for line in process.splitlines() if line.strip()]
+        argv = next((event["argv"] for event in events if event["event"] == "start"), [])
+        if "fetch" not in argv or "--append" not in argv or argv[-1] not in remotes:
+            continue
+        if any(arg.startswith("--submodule-prefix") for arg in argv):
+            continue
+        objects = sum(
+            int(arg.rpartition(",")[2])
+            for event in events
+            if event["event"] == "child_start"
+            for arg in event["argv"]
+            if arg.startswith("--pack_header=")
+        )
+        elapsed = next((event["t_abs"] for event in events if event["event"] == "exit"), 0)
+        stats[argv[-1]] = (objects, round(elapsed * 1000))
+    return [f"{remote}\t{stats[remote][0]}\t{stats[remote][1]}" for remote in remotes if remote in stats]
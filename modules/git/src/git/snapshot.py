@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from dagger import function, object_type
+
+SNAPSHOT_SCRIPT = """set -e
+# Every field is assigned before printing, so a failing command stops the exec instead of printing an empty field.
+if git rev-parse --verify --quiet HEAD >/dev/null; then
+  head_sha="$(git rev-parse --verify HEAD)"
+  short_sha="$(git rev-parse --short="$1" HEAD)"
+else
+  # Unborn HEAD: a repository without commits still has a branch, remotes, and status.
+  head_sha=""
+  short_sha=""
+fi
+branch="$(git branch --show-current)"
+if ! ref="$(git symbolic-ref --quiet HEAD)"; then
+  ref="$head_sha"
+fi
+shallow="$(git rev-parse --is-shallow-repository)"
+remotes="$(git remote)"
+printf 'head_sha\\000%s\\000short_sha\\000%s\\000' "$head_sha" "$short_sha"
+printf 'branch\\000%s\\000ref\\000%s\\000shallow\\000%s\\000' "$branch" "$ref" "$shallow"
+for remote in $remotes; do
+  url="$(git remote get-url "$remote")"
+  printf 'remote\\000%s\\000%s\\000' "$remote" "$url"
+done
+if [ "$2" = true ]; then
+  printf 'status\\000'
+  git status --porcelain
+  printf '\\000'
+fi
+"""
+
+
+@object_type
+class GitSnapshot:
+    """Repository HEAD metadata collected by one Git exec."""
+
+    head_sha_: str
+    short_sha_: str
+    branch_: str
+    ref_: str
+    shallow_: bool
+    remote_names_: list[str]
+    remote_urls_: list[str]
+    status_porcelain_: str | None = None
+
+    @function
+    def get_head_sha(self) -> str:
+        """Return full commit SHA for HEAD."""
+        return self._require_head(self.head_sha_)
+
+    @function
+    def get_short_commit_sha(self) -> str:
+        """Return short commit SHA for HEAD."""
+        return self._require_head(self.short_sha_)
+
+    @function
+    def get_current_branch(self) -> str:
+        """Return the current branch name, or an empty string for detached HEAD."""
+        return self.branch_
+
+    @function
+    def get_current_ref(self) -> str:
+        """Return the current symbolic ref, or the full HEAD SHA for detached HEAD."""
+        return self.ref_
+
+    @function
+    def get_remotes(self) -> list[str]:
+        """Return configured remote names."""
+        return self.remote_names_
+
+    @function
+    def get_remote_url(self, remote: str = "origin") -> str:
+        """Return the configured URL for a remote."""
+        for name, url in zip(self.remote_names_, self.remote_urls_, strict=True):
+            if name == remote:
+                return url
+        msg = f"Git remote not found: {remote}"
+        raise ValueError(msg)
+
+    @function
+    def has_shallow_history(self) -> bool:
+        """Return whether the repository is a shallow clone."""
+        return self.shallow_
+
+    @function
+    def get_status_porcelain(self) -> str:
+        """Return git status in porcelain format."""
+        if self.status_porcelain_ is None:
+            msg = "Git snapshot was collected without worktree status"
+            raise ValueError(msg)
+        return self.status_porcelain_
+
+    @function
+    def has_clean_worktree(self) -> bool:
+        """Return whether the repository worktree has no pending changes."""
+        return self.get_status_porcelain().strip() == ""
+
+    def _require_head(self, sha: str) -> str:
+        if not sha:
+            msg = f"HEAD has no commits yet on {self.ref_}"
+            raise ValueError(msg)
+        return sha
+
+
+def parse_snapshot(output: str) -> GitSnapshot:
+    values: dict[str, str] = {}
+    remote_names: list[str] = []
+    remote_urls: list[str] = []
+
+    fields = iter(output.split("\0"))
+    for key in fields:
+        if not key:
+            continue
+        if key == "remote":
+            remote_names.append(next(fields))
+            remote_urls.append(next(fields))
+            continue
+        values[key] = next(fields)
+
+    return GitSnapshot(
+        head_sha_=values["head_sha"],
+        short_sha_=values["short_sha"],
+        branch_=values["branch"],
+        ref_=values["ref"],
+        shallow_=values["shallow"] == "true",
+        remote_names_=remote_names,
+        remote_urls_=remote_urls,
+        status_porcelain_=values.get("status"),
+    )
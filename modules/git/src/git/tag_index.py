@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from fnmatch import fnmatchcase
+
+import dagger
+from dagger import function, object_type
+
+from .git_dir import OBJECT_ID_PATTERN
+from .paths import has_glob_meta
+
+TAG_INDEX_SCRIPT = (
+    'printf "%s\\n" "$(git rev-parse --verify --quiet HEAD)"; '
+    "git for-each-ref --sort=version:refname "
+    "--format='%(refname:strip=2)%00%(objectname)%00%(*objectname)%00%(creatordate:unix)' "
+    '"$1"'
+)
+
+
+@object_type
+class GitTagIndex:
+    """Tag names, targets, and semver order collected by one for-each-ref exec."""
+
+    container_: dagger.Container
+    head_sha_: str
+    names_: list[str]
+    object_names_: list[str]
+    commits_: list[str]
+    creator_dates_: list[int]
+    semver_order_: list[int]
+    name_order_: list[int]
+
+    @function
+    def get_tags(self, pattern: str = "*", sort: str = "version") -> list[str]:
+        """Return indexed tags matching a glob pattern in version, refname, or creatordate order."""
+        descending = sort.startswith("-")
+        sort_key = sort.removeprefix("-").strip() or "version"
+        indexes = [index for index, name in enumerate(self.names_) if fnmatchcase(name, pattern)]
+
+        if sort_key in ("version", "version:refname", "v:refname"):
+            ordered = indexes
+        elif sort_key in ("name", "refname"):
+            ordered = sorted(indexes, key=lambda index: self.names_[index].encode())
+        elif sort_key == "creatordate":
+            ordered = sorted(indexes, key=lambda index: self.creator_dates_[index])
+        else:
+            msg = f"Unsupported tag index sort key: {sort}"
+            raise ValueError(msg)
+
+        if descending:
+            ordered = list(reversed(ordered))
+        return [self.names_[index] for index in ordered]
+
+    @function
+    def has_tag(self, tag: str) -> bool:
+        """Return whether an exact tag exists in the index."""
+        return self._name_index(tag) is not None
+
+    @function
+    def get_latest_tag(self, pattern: str = "*", semver: bool | None = True) -> str:
+        """Return the latest tag matching a glob pattern, or an empty string when none match."""
+        return self._latest(lambda name: fnmatchcase(name, pattern), semver=semver)
+
+    @function
+    def get_latest_tags(self, prefixes: list[str], semver: bool | None = True) -> list[str]:
+        """Return the latest tag for each tag prefix, with empty strings for prefixes without tags."""
+        return [self._latest(lambda name, prefix=prefix: name.startswith(prefix), semver=semver) for prefix in prefixes]
+
+    @function
+    async def get_tags_pointing_at(self, ref: str = "HEAD") -> list[str]:
+        """Return indexed tags that point at the commit a ref resolves to, like git tag --points-at."""
+        if ref == "HEAD":
+            sha = self.head_sha_
+        elif (index := self._name_index(ref)) is not None:
+            sha = self.commits_[index]
+        elif OBJECT_ID_PATTERN.match(ref):
+            sha = ref
+        else:
+            # Branches, short SHAs, and revision expressions need Git; the index only stores full object names.
+            sha = (
+                await self.container_.with_exec(["git", "rev-parse", "--verify", f"{ref}^{{commit}}"]).stdout()
+            ).strip()
+        if not sha:
+            return []
+        return [
+            name
+            for name, object_name, commit in zip(self.names_, self.object_names_, self.commits_, strict=True)
+            if sha in (object_name, commit)
+        ]
+
+    def _name_index(self, name: str) -> int | None:
+        # Dagger fields cannot hold a dict, so names are looked up by bisecting the index sorted by name.
+        position = bisect_left(self.name_order_, name, key=lambda index: self.names_[index])
+        if position < len(self.name_order_) and self.names_[self.name_order_[position]] == name:
+            return self.name_order_[position]
+        return None
+
+    def _latest(self, matches, semver: bool | None) -> str:
+        indexes = reversed(self.semver_order_) if semver else range(len(self.names_) - 1, -1, -1)
+        for index in indexes:
+            if matches(self.names_[index]):
+                return self.names_[index]
+        return ""
+
+
+def tag_index_ref_pattern(pattern: str) -> str:
+    glob_start = next((index for index, char in enumerate(pattern) if has_glob_meta(char)), len(pattern))
+    literal_dirs = pattern[:glob_start].rpartition("/")[0]
+    return f"refs/tags/{literal_dirs}/" if literal_dirs else "refs/tags/"
+
+
+def parse_tag_index(output: str, pattern: str, container: dagger.Container) -> GitTagIndex:
+    head_sha, _, records = output.partition("\n")
+    names: list[str] = []
+    object_names: list[str] = []
+    commits: list[str] = []
+    creator_dates: list[int] = []
+
+    for record in records.splitlines():
+        if not record:
+            continue
+        name, object_name, peeled_object_name, creator_date = record.split("\0")
+        if not fnmatchcase(name, pattern):
+            continue
+        names.append(name)
+        object_names.append(object_name)
+        commits.append(peeled_object_name or object_name)
+        creator_dates.append(int(creator_date or 0))
+
+    semver_keys = [(index, version) for index, name in enumerate(names) if (version := parse_semver_tag(name))]
+    semver_keys.sort(key=lambda item: (item[1], -item[0]))
+
+    return GitTagIndex(
+        container_=container,
+        head_sha_=head_sha.strip(),
+        names_=names,
+        object_names_=object_names,
+        commits_=commits,
+        creator_dates_=creator_dates,
+        semver_order_=[index for index, _ in semver_keys],
+        name_order_=sorted(range(len(names)), key=names.__getitem__),
+    )
+
+
+SEMVER_TAG_PATTERN = re.compile(
+    r"^v?(?P<major>0|[1-9]\d*)\.(?P<minor>0|[1-9]\d*)\.(?P<patch>0|[1-9]\d*)"
+    r"(?:-(?P<prerelease>[0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?$"
+)
+
+
+def parse_semver_tag(tag: str) -> tuple[int, int, int, tuple[int | str, ...]] | None:
+    version_text = tag.rsplit("/", maxsplit=1)[-1]
+    match = SEMVER_TAG_PATTERN.fullmatch(version_text)
+    if not match:
+        return None
+
+    prerelease = match.group("prerelease")
+    return (
+        int(match.group("major")),
+        int(match.group("minor")),
+        int(match.group("patch")),
+        prerelease_key(prerelease),
+    )
+
+
+def prerelease_key(prerelease: str | None) -> tuple[int | str, ...]:
+    if prerelease is None:
+        return (1,)
+
+    parts: list[int | str] = [0]
+    for part in prerelease.split("."):
+        if part.isdigit():
+            parts.extend((0, int(part)))
+        else:
+            parts.extend((1, part))
+    return tuple(parts)
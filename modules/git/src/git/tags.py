@@ -1,10 +1,24 @@
 from __future__ import annotations
 
-import re
+from fnmatch import fnmatchcase
 
 import dagger
 
 from .cli import GitCli
+from .git_dir import source_git_dir
+from .refs import fetch_options
+from .tag_index import TAG_INDEX_SCRIPT, GitTagIndex, parse_tag_index, tag_index_ref_pattern
+
+PUSH_TAGS_SCRIPT = """set -e
+remote="$1"
+shift
+for tag do
+  git rev-parse --quiet --verify "refs/tags/$tag" >/dev/null || git tag "$tag"
+  set -- "$@" "refs/tags/$tag:refs/tags/$tag"
+  shift
+done
+git push --atomic "$remote" "$@"
+"""
 
 
 class Tags:
@@ -13,8 +27,14 @@ class Tags:
     def __init__(self, git: GitCli) -> None:
         self.git = git
 
-    def with_fetched_tags(self, remote: str, prune: bool | None) -> GitCli:
-        cmd = ["git", "fetch", "--tags", remote]
+    def with_fetched_tags(
+        self,
+        remote: str,
+        prune: bool | None,
+        filter: str | None = None,
+        negotiation_tips: list[str] | None = None,
+    ) -> GitCli:
+        cmd = ["git", "fetch", "--tags", *fetch_options(filter=filter, negotiation_tips=negotiation_tips), remote]
         if prune:
             cmd.insert(2, "--prune")
         self.git.container_ = self.git.container().with_exec(cmd)
@@ -27,23 +47,25 @@ class Tags:
         return [line.strip() for line in output.splitlines() if line.strip()]
 
     async def has_tag(self, tag: str) -> bool:
+        git_dir = source_git_dir(self.git)
+        if git_dir and (exists := await git_dir.has_ref(f"refs/tags/{tag}")) is not None:
+            return exists
         try:
             await self.git.container().with_exec(["git", "show-ref", "--verify", "--quiet", f"refs/tags/{tag}"]).sync()
             return True
         except dagger.ExecError:
             return False
 
-    async def get_latest_tag(self, pattern: str, semver: bool | None) -> str:
-        tags = await self.get_tags(pattern=pattern, sort="version")
-        if not tags:
-            return ""
-        if not semver:
-            return tags[-1]
+    async def get_tag_index(self, pattern: str) -> GitTagIndex:
+        container = self.git.container()
+        output = await container.with_exec(
+            ["sh", "-c", TAG_INDEX_SCRIPT, "get-tag-index", tag_index_ref_pattern(pattern)]
+        ).stdout()
+        return parse_tag_index(output, pattern=pattern, container=container)
 
-        semver_tags = [(tag, version) for tag in tags if (version := parse_semver_tag(tag))]
-        if not semver_tags:
-            return ""
-        return max(semver_tags, key=lambda item: item[1])[0]
+    async def get_latest_tag(self, pattern: str, semver: bool | None) -> str:
+        tag_index = await self.get_tag_index(pattern=pattern)
+        return tag_index.get_latest_tag(pattern=pattern, semver=semver)
 
     async def get_tags_pointing_at(self, ref: str) -> list[str]:
         output = (
@@ -51,25 +73,54 @@ class Tags:
         )
         return [line.strip() for line in output.splitlines() if line.strip()]
 
-    async def ensure_pushed_tag(self, tag: str, remote: str) -> str:
-        self.with_fetched_tags(remote=remote, prune=False)
-        if await self.has_tag(tag=tag):
-            return tag
-
-        self.create_tag(
-            tag=tag,
-            message=None,
-            user_name="dagger-ci",
-            user_email="dagger-ci@example.local",
+    async def get_remote_tags(self, pattern: str, remote: str) -> list[str]:
+        output = (
+            await self.git.container()
+            .with_exec(
+                ["git", "ls-remote", "--tags", "--refs", "--sort=version:refname", remote, f"refs/tags/{pattern}"]
+            )
+            .stdout()
         )
-        self.push_tag(tag=tag, remote=remote)
-        await (
-            self.git.container()
-            .with_exec(["git", "ls-remote", "--exit-code", "--tags", remote, f"refs/tags/{tag}"])
-            .sync()
+        return [tag for tag in parse_ls_remote_tags(output) if fnmatchcase(tag, pattern)]
+
+    async def has_remote_tag(self, tag: str, remote: str) -> bool:
+        output = (
+            await self.git.container()
+            .with_exec(["git", "ls-remote", "--tags", "--refs", remote, f"refs/tags/{tag}"])
+            .stdout()
         )
+        return tag in parse_ls_remote_tags(output)
+
+    async def ensure_pushed_tag(self, tag: str, remote: str) -> str:
+        await self.ensure_pushed_tags(tags=[tag], remote=remote)
         return tag
 
+    async def ensure_pushed_tags(self, tags: list[str], remote: str) -> list[str]:
+        requested_tags = list(dict.fromkeys(tags))
+        if not requested_tags:
+            return []
+
+        refs = [f"refs/tags/{tag}" for tag in requested_tags]
+        output = await self.git.container().with_exec(["git", "ls-remote", "--tags", "--refs", remote, *refs]).stdout()
+        remote_tags = set(parse_ls_remote_tags(output))
+        missing_tags = [tag for tag in requested_tags if tag not in remote_tags]
+
+        if missing_tags:
+            # Read the pushed refs back from the remote in the same chain; the push itself is not kept.
+            output = await (
+                self.git.container()
+                .with_exec(["sh", "-c", PUSH_TAGS_SCRIPT, "ensure-pushed-tags", remote, *missing_tags])
+                .with_exec(
+                    ["git", "ls-remote", "--tags", "--refs", remote, *(f"refs/tags/{tag}" for tag in missing_tags)]
+                )
+                .stdout()
+            )
+            unpushed_tags = sorted(set(missing_tags).difference(parse_ls_remote_tags(output)))
+            if unpushed_tags:
+                msg = f"Tags are missing on remote {remote} after push: {', '.join(unpushed_tags)}"
+                raise ValueError(msg)
+        return [f"{tag}\t{'created' if tag in missing_tags else 'existing'}" for tag in requested_tags]
+
     def create_tag(self, tag: str, message: str | None, user_name: str, user_email: str) -> GitCli:
         cmd = ["git", "tag", tag]
         if message is not None:
@@ -111,35 +162,10 @@ def tag_sort(sort: str) -> str:
     return git_sort
 
 
-SEMVER_TAG_PATTERN = re.compile(
-    r"^v?(?P<major>0|[1-9]\d*)\.(?P<minor>0|[1-9]\d*)\.(?P<patch>0|[1-9]\d*)"
-    r"(?:-(?P<prerelease>[0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?$"
-)
-
-
-def parse_semver_tag(tag: str) -> tuple[int, int, int, tuple[int | str, ...]] | None:
-    version_text = tag.rsplit("/", maxsplit=1)[-1]
-    match = SEMVER_TAG_PATTERN.fullmatch(version_text)
-    if not match:
-        return None
-
-    prerelease = match.group("prerelease")
-    return (
-        int(match.group("major")),
-        int(match.group("minor")),
-        int(match.group("patch")),
-        prerelease_key(prerelease),
-    )
-
-
-def prerelease_key(prerelease: str | None) -> tuple[int | str, ...]:
-    if prerelease is None:
-        return (1,)
-
-    parts: list[int | str] = [0]
-    for part in prerelease.split("."):
-        if part.isdigit():
-            parts.extend((0, int(part)))
-        else:
-            parts.extend((1, part))
-    return tuple(parts)
+def parse_ls_remote_tags(output: str) -> list[str]:
+    tags: list[str] = []
+    for line in output.splitlines():
+        _, _, ref = line.partition("\t")
+        if ref.startswith("refs/tags/") and not ref.endswith("^{}"):
+            tags.append(ref.removeprefix("refs/tags/"))
+    return tags
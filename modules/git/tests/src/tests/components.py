@@ -1,5 +1,6 @@
 from unittest import TestCase
 
+import dagger
 from dagger import dag
 
 from .fixtures import SyntheticGitRepos
@@ -11,9 +12,14 @@ class ComponentTests(SyntheticGitRepos):
     async def all(self) -> None:
         await self.components_from_explicit_roots()
         await self.components_from_glob_like_roots()
+        await self.components_at_ref()
         await self.changed_components_from_component_roots()
         await self.shared_path_change_returns_all_components()
         await self.single_component_change_returns_repository_root()
+        await self.changed_components_from_change_set()
+        await self.affected_components_follow_dependency_manifest()
+        await self.affected_components_reject_dependency_cycles()
+        await self.source_for_paths_keeps_only_selected_subtrees()
 
     async def components_from_explicit_roots(self) -> None:
         """Return existing explicit component roots in stable sorted order."""
@@ -43,6 +49,19 @@ class ComponentTests(SyntheticGitRepos):
         test_case.assertEqual(["packages/shared", "services/api", "services/web"], components)
         test_case.assertEqual(["environments/dev/apps/api", "environments/prod/apps/api"], nested_components)
 
+    async def components_at_ref(self) -> None:
+        """Resolve component roots against a ref tree instead of the worktree."""
+        git = dag.git(source=self.repo_with_monorepo_pull_request_branch().directory("/work/repo"))
+
+        worktree_components = await git.get_components(component_roots=["services/api/*", "packages/*"])
+        base_components = await git.get_components(component_roots=["services/api/*", "packages/*"], ref="main")
+        missing_components = await git.get_components(component_roots=["services/api/internal"], ref="main")
+
+        test_case = TestCase()
+        test_case.assertEqual(["packages/shared", "services/api/internal"], worktree_components)
+        test_case.assertEqual(["packages/shared"], base_components)
+        test_case.assertEqual([], missing_components)
+
     async def changed_components_from_component_roots(self) -> None:
         """Return discovered components whose files changed between refs."""
         git = dag.git(source=self.repo_with_changed_components().directory("/work/repo"))
@@ -124,3 +143,115 @@ class ComponentTests(SyntheticGitRepos):
         test_case.assertEqual(["."], root_components)
         test_case.assertEqual([], unchanged_components)
         test_case.assertEqual(["."], shared_components)
+
+    async def changed_components_from_change_set(self) -> None:
+        """Return changed components and shared path fan-out from one change set."""
+        changed_set = dag.git(source=self.repo_with_changed_components().directory("/work/repo")).get_change_set(
+            base_ref="main",
+            head_ref="feature",
+        )
+        shared_set = dag.git(source=self.repo_with_shared_path_change().directory("/work/repo")).get_change_set(
+            base_ref="main",
+            head_ref="feature",
+        )
+
+        test_case = TestCase()
+        test_case.assertEqual(
+            ["packages/shared", "services/api"],
+            await changed_set.get_components(component_roots=["services/*", "packages/*"]),
+        )
+        test_case.assertEqual(
+            ["services/api"],
+            await changed_set.get_components(component_roots=["services/api", "services/web", "services/missing"]),
+        )
+        test_case.assertEqual(
+            ["packages/shared", "services/api", "services/web"],
+            await shared_set.get_components(component_roots=["services/*", "packages/*"], shared_paths=["shared"]),
+        )
+        test_case.assertEqual(["."], await changed_set.get_components(component_roots=["docs"], single_component=True))
+
+    async def affected_components_follow_dependency_manifest(self) -> None:
+        """Expand changed components to transitive dependents in dependency order with inclusion reasons."""
+        git = dag.git(source=self.repo_with_changed_components().directory("/work/repo"))
+        manifest = (
+            dag.directory()
+            .with_new_file(
+                "dependencies.yaml",
+                (
+                    "services/api: [packages/shared]\n"
+                    "services/web: [packages/shared]\n"
+                    "services/worker:\n"
+                    "  depends_on: [services/web]\n"
+                    "services/docs-site:\n"
+                    "  paths: [docs]\n"
+                ),
+            )
+            .file("dependencies.yaml")
+        )
+
+        components = await git.get_affected_components(
+            base_ref="main",
+            head_ref="feature",
+            component_roots=["services/*", "packages/*"],
+            dependency_manifest=manifest,
+        )
+        without_manifest = await git.get_affected_components(
+            base_ref="main",
+            head_ref="feature",
+            component_roots=["services/*", "packages/*"],
+        )
+
+        test_case = TestCase()
+        test_case.assertEqual(
+            [
+                "packages/shared\tchanged",
+                "services/api\tchanged",
+                "services/docs-site\tdeclared path docs",
+                "services/web\tdepends on packages/shared",
+                "services/worker\tdepends on services/web",
+            ],
+            components,
+        )
+        test_case.assertEqual(["packages/shared\tchanged", "services/api\tchanged"], without_manifest)
+
+    async def affected_components_reject_dependency_cycles(self) -> None:
+        """Fail clearly when the dependency manifest contains a cycle."""
+        git = dag.git(source=self.repo_with_changed_components().directory("/work/repo"))
+        manifest = (
+            dag.directory()
+            .with_new_file(
+                "dependencies.json",
+                '{"services/api": ["packages/shared"], "packages/shared": ["services/api"]}',
+            )
+            .file("dependencies.json")
+        )
+        test_case = TestCase()
+
+        try:
+            await git.get_affected_components(
+                base_ref="main",
+                head_ref="feature",
+                component_roots=["services/*", "packages/*"],
+                dependency_manifest=manifest,
+            )
+        except dagger.QueryError as error:
+            test_case.assertIn("Dependency cycle between components: packages/shared, services/api", str(error))
+        else:
+            test_case.fail("get_affected_components should reject dependency cycles")
+
+    async def source_for_paths_keeps_only_selected_subtrees(self) -> None:
+        """Return a source directory with only the selected component and shared path subtrees."""
+        git = dag.git(source=self.repo_with_components().directory("/work/repo"))
+
+        source = git.get_source_for_paths(paths=["services/api", "environments/*/apps/api"], shared_paths=["docs"])
+        full_source = git.get_source_for_paths(paths=["."])
+
+        async def entries(directory: dagger.Directory) -> list[str]:
+            return sorted(entry.rstrip("/") for entry in await directory.entries())
+
+        test_case = TestCase()
+        test_case.assertEqual(["docs", "environments", "services"], await entries(source))
+        test_case.assertEqual(["api"], await entries(source.directory("services")))
+        test_case.assertEqual(["dev", "prod"], await entries(source.directory("environments")))
+        test_case.assertEqual("api\n", await source.file("services/api/app.py").contents())
+        test_case.assertEqual(["docs", "environments", "packages", "services"], await entries(full_source))
@@ -1,5 +1,6 @@
 from unittest import TestCase
 
+import dagger
 from dagger import dag
 
 from .fixtures import SyntheticGitRepos
@@ -9,13 +10,37 @@ class DiffTests(SyntheticGitRepos):
     """Diff behavior tests."""
 
     async def all(self) -> None:
+        await self.changed_paths_for_worktree_changes()
         await self.changed_files_between_refs()
         await self.changed_files_path_and_diff_filters()
+        await self.changed_files_pathspec_magic()
+        await self.changed_files_wildcard_directory_pathspecs_match_git()
         await self.changed_files_since_merge_base_for_pull_request_branch()
         await self.changed_dirs_root_scoped()
         await self.changed_dirs_subdirectory_scoped()
         await self.changed_dirs_since_merge_base_for_monorepo_scopes()
         await self.has_changes_for_changed_and_unchanged_paths()
+        await self.change_set_answers_files_dirs_and_changes()
+        await self.change_set_since_merge_base()
+        await self.change_set_rename_detection_modes()
+        await self.change_set_rejects_unknown_rename_detection()
+        await self.diff_stats_for_files_dirs_and_components()
+        await self.commit_changes_attribute_components_per_commit()
+        await self.changed_files_recurse_into_changed_submodules()
+
+    async def changed_paths_for_worktree_changes(self) -> None:
+        """Return top-level changed paths for tracked, untracked, and newline-named worktree files."""
+        git = dag.git(source=self.repo_with_worktree_changes_under_modules())
+
+        module_paths = await git.get_changed_paths(target_branch="main", diff_path="modules/")
+        root_paths = await git.get_changed_paths(target_branch="main")
+
+        test_case = TestCase()
+        test_case.assertEqual(
+            ["modules/alpha", "modules/delta", "modules/gamma dir", "modules/notes.txt"],
+            module_paths,
+        )
+        test_case.assertEqual(["modules"], root_paths)
 
     async def changed_files_between_refs(self) -> None:
         """Return added, copied, modified, renamed, and type-changed files between refs."""
@@ -42,7 +67,12 @@ class DiffTests(SyntheticGitRepos):
         git = dag.git(source=self.repo_with_diff_statuses().directory("/work/repo"))
 
         modified_files = await git.get_changed_files(base_ref="main", head_ref="feature", diff_filter="M")
-        copied_files = await git.get_changed_files(base_ref="main", head_ref="feature", diff_filter="C")
+        copied_files = await git.get_changed_files(
+            base_ref="main",
+            head_ref="feature",
+            diff_filter="C",
+            rename_detection="copies-harder",
+        )
         renamed_files = await git.get_changed_files(base_ref="main", head_ref="feature", diff_filter="R")
         scoped_files = await git.get_changed_files(base_ref="main", head_ref="feature", paths=["services/api"])
         type_changed_files = await git.get_changed_files(base_ref="main", head_ref="feature", diff_filter="T")
@@ -54,6 +84,51 @@ class DiffTests(SyntheticGitRepos):
         test_case.assertEqual(["services/api/handler.py", "services/api/internal/jobs/worker.py"], scoped_files)
         test_case.assertEqual(["type-change"], type_changed_files)
 
+    async def changed_files_pathspec_magic(self) -> None:
+        """Apply exclude and glob pathspec magic to changed files and reject magic that cannot be matched."""
+        git = dag.git(source=self.repo_with_diff_statuses().directory("/work/repo"))
+
+        excluded_files = await git.get_changed_files(base_ref="main", head_ref="feature", paths=[":!services"])
+        glob_files = await git.get_changed_files(
+            base_ref="main",
+            head_ref="feature",
+            paths=[":(glob)services/*/*.py"],
+        )
+        scoped_dirs = await git.get_changed_dirs(
+            base_ref="main",
+            head_ref="feature",
+            paths=["services", ":(exclude)services/api/internal"],
+            depth=2,
+        )
+
+        test_case = TestCase()
+        test_case.assertEqual(
+            ["added.txt", "copied.txt", "modified.txt", "renamed.txt", "type-change"],
+            sorted(excluded_files),
+        )
+        test_case.assertEqual(["services/api/handler.py"], glob_files)
+        test_case.assertEqual(["services/api"], scoped_dirs)
+        try:
+            await git.get_changed_files(base_ref="main", head_ref="feature", paths=[":(attr:lfs)assets"])
+        except dagger.QueryError as error:
+            test_case.assertIn("Unsupported pathspec magic: attr:lfs", str(error))
+        else:
+            test_case.fail("get_changed_files should reject unsupported pathspec magic")
+
+    async def changed_files_wildcard_directory_pathspecs_match_git(self) -> None:
+        """Match wildcard pathspecs against whole paths, not as directory prefixes, like git diff."""
+        repo = self.repo_with_diff_statuses()
+        git = dag.git(source=repo.directory("/work/repo"))
+        test_case = TestCase()
+
+        for pathspec in ["services/a?i", "services/a?i/internal", ":(glob)services/*", "services/*"]:
+            changed_files = await git.get_changed_files(base_ref="main", head_ref="feature", paths=[pathspec])
+            changed_dirs = await git.get_changed_dirs(base_ref="main", head_ref="feature", paths=[pathspec])
+            expected = await repo.with_exec(["git", "diff", "--name-only", "main", "feature", "--", pathspec]).stdout()
+
+            test_case.assertEqual(sorted(expected.splitlines()), sorted(changed_files), pathspec)
+            test_case.assertEqual(bool(expected.strip()), bool(changed_dirs), pathspec)
+
     async def changed_files_since_merge_base_for_pull_request_branch(self) -> None:
         """Return only pull request branch changes since the shared merge base."""
         git = dag.git(source=self.repo_with_pull_request_branch().directory("/work/repo"))
@@ -79,7 +154,12 @@ class DiffTests(SyntheticGitRepos):
 
         top_level_dirs = await git.get_changed_dirs(base_ref="main", head_ref="feature")
         second_level_dirs = await git.get_changed_dirs(base_ref="main", head_ref="feature", depth=2)
-        copied_dirs = await git.get_changed_dirs(base_ref="main", head_ref="feature", diff_filter="C")
+        copied_dirs = await git.get_changed_dirs(
+            base_ref="main",
+            head_ref="feature",
+            diff_filter="C",
+            rename_detection="copies-harder",
+        )
 
         test_case = TestCase()
         test_case.assertEqual([".", "services"], top_level_dirs)
@@ -156,3 +236,198 @@ class DiffTests(SyntheticGitRepos):
         test_case.assertFalse(has_unchanged_path_changes)
         test_case.assertTrue(has_matching_status_changes)
         test_case.assertFalse(has_non_matching_status_changes)
+
+    async def change_set_answers_files_dirs_and_changes(self) -> None:
+        """Answer file, directory, rename, and has-changes queries from one change set."""
+        change_set = dag.git(source=self.repo_with_diff_statuses().directory("/work/repo")).get_change_set(
+            base_ref="main",
+            head_ref="feature",
+            rename_detection="copies-harder",
+        )
+
+        test_case = TestCase()
+        test_case.assertEqual(
+            [
+                "added.txt",
+                "copied.txt",
+                "modified.txt",
+                "renamed.txt",
+                "services/api/handler.py",
+                "services/api/internal/jobs/worker.py",
+                "type-change",
+            ],
+            sorted(await change_set.get_files()),
+        )
+        test_case.assertEqual(["copied.txt"], await change_set.get_files(diff_filter="C"))
+        test_case.assertEqual(
+            ["services/api/handler.py", "services/api/internal/jobs/worker.py"],
+            await change_set.get_files(paths=["services/api"]),
+        )
+        test_case.assertEqual([".", "services/api"], await change_set.get_dirs(depth=2))
+        test_case.assertEqual(
+            ["services/api", "services/api/internal"],
+            await change_set.get_dirs(paths=["services/api"]),
+        )
+        test_case.assertEqual(
+            ["copy-source.txt\tcopied.txt", "renamed-from.txt\trenamed.txt"],
+            sorted(await change_set.get_renames()),
+        )
+        test_case.assertIn("M\tmodified.txt", await change_set.get_name_status())
+        test_case.assertTrue(await change_set.has_changes(diff_filter="T"))
+        test_case.assertFalse(await change_set.has_changes(paths=["copy-source.txt"]))
+
+    async def change_set_since_merge_base(self) -> None:
+        """Ignore base branch drift when the change set is computed from the merge base."""
+        git = dag.git(source=self.repo_with_monorepo_pull_request_branch().directory("/work/repo"))
+
+        change_set = git.get_change_set(base_ref="main", head_ref="feature", merge_base=True)
+        direct_change_set = git.get_change_set(base_ref="main", head_ref="feature")
+
+        test_case = TestCase()
+        test_case.assertEqual(["packages", "services"], await change_set.get_dirs())
+        test_case.assertIn("docs/main-only.md", await direct_change_set.get_files(diff_filter="D"))
+        test_case.assertNotIn("docs/main-only.md", await change_set.get_files(diff_filter="D"))
+        test_case.assertEqual(
+            ["packages/shared", "services/api", "services/web"],
+            await change_set.get_components(component_roots=["services/*", "packages/*"]),
+        )
+
+    async def change_set_rename_detection_modes(self) -> None:
+        """Report renames and copies only as far as the requested rename detection mode allows."""
+        git = dag.git(source=self.repo_with_diff_statuses().directory("/work/repo"))
+
+        default_change_set = git.get_change_set(base_ref="main", head_ref="feature")
+        off_change_set = git.get_change_set(base_ref="main", head_ref="feature", rename_detection="off")
+        copies_change_set = git.get_change_set(base_ref="main", head_ref="feature", rename_detection="copies")
+        limited_change_set = git.get_change_set(
+            base_ref="main",
+            head_ref="feature",
+            rename_detection="copies-harder",
+            rename_limit=1,
+        )
+
+        test_case = TestCase()
+        test_case.assertEqual(["renamed-from.txt\trenamed.txt"], await default_change_set.get_renames())
+        test_case.assertIn("A\tcopied.txt", await default_change_set.get_name_status())
+        test_case.assertEqual([], await off_change_set.get_renames())
+        test_case.assertEqual(["renamed-from.txt"], await off_change_set.get_files(diff_filter="D"))
+        test_case.assertEqual(["renamed-from.txt\trenamed.txt"], await copies_change_set.get_renames())
+        test_case.assertEqual(["renamed.txt"], await limited_change_set.get_files(diff_filter="R"))
+
+    async def change_set_rejects_unknown_rename_detection(self) -> None:
+        """Fail clearly for unsupported rename detection modes."""
+        git = dag.git(source=self.repo_with_diff_statuses().directory("/work/repo"))
+        test_case = TestCase()
+
+        try:
+            await git.get_changed_files(base_ref="main", head_ref="feature", rename_detection="harder")
+        except dagger.QueryError as error:
+            test_case.assertIn("Unsupported rename detection: harder", str(error))
+        else:
+            test_case.fail("get_changed_files should reject unknown rename detection modes")
+
+    async def diff_stats_for_files_dirs_and_components(self) -> None:
+        """Return per-file line counts, binary flags, and directory and component totals from one numstat diff."""
+        repo = (
+            self.repo_with_diff_statuses()
+            .with_exec(["sh", "-c", "printf '\\000\\001' > services/api/logo.bin && git add . && git commit -m binary"])
+            .directory("/work/repo")
+        )
+        diff_stats = dag.git(source=repo).get_diff_stats(base_ref="main", head_ref="feature")
+        scoped_diff_stats = dag.git(source=repo).get_diff_stats(
+            base_ref="main",
+            head_ref="feature",
+            paths=["services/api"],
+        )
+
+        test_case = TestCase()
+        test_case.assertEqual(
+            [
+                "1\t0\tadded.txt",
+                "1\t0\tcopied.txt",
+                "1\t1\tmodified.txt",
+                "0\t0\trenamed.txt",
+                "1\t0\tservices/api/handler.py",
+                "1\t0\tservices/api/internal/jobs/worker.py",
+                "-\t-\tservices/api/logo.bin",
+                "1\t1\ttype-change",
+            ],
+            await diff_stats.get_file_stats(),
+        )
+        test_case.assertEqual(6, await diff_stats.get_added_lines())
+        test_case.assertEqual(2, await diff_stats.get_removed_lines())
+        test_case.assertEqual(8, await diff_stats.get_changed_lines())
+        test_case.assertEqual(["services/api/logo.bin"], await diff_stats.get_binary_files())
+        test_case.assertEqual([".\t4\t2\t5", "services\t2\t0\t3"], await diff_stats.get_dir_stats())
+        test_case.assertEqual(
+            ["services/api\t2\t0\t3"],
+            await diff_stats.get_component_stats(component_roots=["services/*"]),
+        )
+        test_case.assertEqual(
+            ["services/api\t1\t0\t2", "services/api/internal\t1\t0\t1"],
+            await scoped_diff_stats.get_dir_stats(paths=["services/api"]),
+        )
+        test_case.assertEqual(2, await scoped_diff_stats.get_added_lines())
+
+    async def commit_changes_attribute_components_per_commit(self) -> None:
+        """Attribute each commit in a range to the component roots it touched from one git log stream."""
+        repo = (
+            self.repo_with_monorepo_pull_request_branch()
+            .with_env_variable("GIT_AUTHOR_DATE", "1700000000 +0000")
+            .with_exec(["sh", "-c", "printf 'fix\\n' >> services/api/app.py && git commit -am 'fix api'"])
+            .with_exec(["sh", "-c", "printf 'guide\\n' >> docs/guide.md && git commit -am 'update docs'"])
+            .directory("/work/repo")
+        )
+        commit_changes = dag.git(source=repo).get_commit_changes(
+            base_ref="main",
+            head_ref="feature",
+            component_roots=["services/*", "packages/*"],
+        )
+
+        commits = [record.split("\t", 2) for record in await commit_changes.get_commits()]
+        changes = [record.split("\t", 3) for record in await commit_changes.get_changes()]
+        api_records = await commit_changes.get_component_commits("services/api")
+        docs_sha, _, feature_sha = (sha for sha, _, _ in commits)
+
+        test_case = TestCase()
+        test_case.assertEqual(["update docs", "fix api", "feature"], [subject for _, _, subject in commits])
+        test_case.assertEqual("1700000000", commits[0][1])
+        test_case.assertEqual(
+            [
+                ("services/api", "fix api"),
+                ("packages/shared", "feature"),
+                ("services/api", "feature"),
+                ("services/web", "feature"),
+            ],
+            [(component, subject) for _, _, component, subject in changes],
+        )
+        test_case.assertEqual(["fix api", "feature"], [record.split("\t", 2)[2] for record in api_records])
+        test_case.assertEqual(
+            ["packages/shared", "services/api", "services/web"],
+            await commit_changes.get_commit_components(feature_sha[:12]),
+        )
+        test_case.assertEqual([], await commit_changes.get_commit_components(docs_sha))
+
+    async def changed_files_recurse_into_changed_submodules(self) -> None:
+        """Report files inside a bumped submodule with superproject paths instead of the gitlink."""
+        git = dag.git(source=self.repo_with_changed_submodule())
+
+        gitlink_files = await git.get_changed_files(base_ref="main", head_ref="feature")
+        recursive_files = await git.get_changed_files(base_ref="main", head_ref="feature", recurse_submodules=True)
+        recursive_dirs = await git.get_changed_dirs(
+            base_ref="main",
+            head_ref="feature",
+            paths=["libs/sub-a"],
+            recurse_submodules=True,
+        )
+        added_files = await git.get_change_set(
+            base_ref="main",
+            head_ref="feature",
+            recurse_submodules=True,
+        ).get_files(diff_filter="A")
+
+        test_case = TestCase()
+        test_case.assertEqual(["app.py", "libs/sub-a"], gitlink_files)
+        test_case.assertEqual(["app.py", "libs/sub-a/docs/new.md", "libs/sub-a/src/lib.py"], recursive_files)
+        test_case.assertEqual(["libs/sub-a/docs", "libs/sub-a/src"], recursive_dirs)
+        test_case.assertEqual(["libs/sub-a/docs/new.md"], added_files)
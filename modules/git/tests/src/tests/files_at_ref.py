@@ -1,5 +1,6 @@
 from unittest import TestCase
 
+import dagger
 from dagger import dag
 
 from .fixtures import SyntheticGitRepos
@@ -11,6 +12,15 @@ class FilesAtRefTests(SyntheticGitRepos):
     async def all(self) -> None:
         await self.has_file_at_ref_for_existing_and_missing_files()
         await self.get_file_contents_at_ref_for_non_head_ref()
+        await self.has_files_at_ref_returns_existing_subset()
+        await self.get_files_at_ref_lays_out_files_at_paths()
+        await self.get_files_at_ref_keeps_file_modes()
+        await self.get_files_at_ref_fails_for_unknown_ref()
+        await self.get_tree_at_ref_exports_requested_subtrees()
+        await self.get_tree_at_ref_fails_for_unknown_ref()
+        await self.get_lfs_files_at_ref_replaces_pointers_with_objects()
+        await self.get_lfs_files_at_ref_fetches_missing_objects_from_remote()
+        await self.get_lfs_files_at_ref_rejects_include_pattern_characters()
 
     async def has_file_at_ref_for_existing_and_missing_files(self) -> None:
         """Return whether files exist at a ref."""
@@ -35,3 +45,151 @@ class FilesAtRefTests(SyntheticGitRepos):
         test_case = TestCase()
         test_case.assertEqual("old contents\n", old_contents)
         test_case.assertEqual("head contents\n", head_contents)
+
+    async def has_files_at_ref_returns_existing_subset(self) -> None:
+        """Return the existing file subset for many paths at a ref."""
+        git = dag.git(source=self.repo_with_diff_statuses().directory("/work/repo"))
+        paths = ["modified.txt", "services/api/handler.py", "missing.txt", "services/api", "renamed-from.txt"]
+
+        main_files = await git.has_files_at_ref(ref="main", paths=paths)
+        feature_files = await git.has_files_at_ref(ref="feature", paths=paths)
+
+        test_case = TestCase()
+        test_case.assertEqual(["modified.txt", "renamed-from.txt"], main_files)
+        test_case.assertEqual(["modified.txt", "services/api/handler.py"], feature_files)
+
+    async def get_files_at_ref_lays_out_files_at_paths(self) -> None:
+        """Return a directory with file contents from a ref at their repository paths."""
+        git = dag.git(source=self.repo_with_diff_statuses().directory("/work/repo"))
+        paths = ["modified.txt", "services/api/handler.py", "missing.txt"]
+
+        main_files = git.get_files_at_ref(ref="main", paths=paths)
+        feature_files = git.get_files_at_ref(ref="feature", paths=paths)
+
+        test_case = TestCase()
+        test_case.assertEqual(["modified.txt"], await main_files.glob("**/*.*"))
+        test_case.assertEqual("before\n", await main_files.file("modified.txt").contents())
+        test_case.assertEqual(
+            ["modified.txt", "services/api/handler.py"],
+            sorted(await feature_files.glob("**/*.*")),
+        )
+        test_case.assertEqual("after\n", await feature_files.file("modified.txt").contents())
+        test_case.assertEqual("handler\n", await feature_files.file("services/api/handler.py").contents())
+
+    async def get_files_at_ref_keeps_file_modes(self) -> None:
+        """Keep executable bits and symlinks from the ref instead of writing regular files."""
+        git = dag.git(source=self.repo_with_executable_and_symlink())
+
+        files = git.get_files_at_ref(ref="main", paths=["run.sh", "link.sh"])
+        modes = await (
+            dag.container()
+            .from_("docker.io/alpine/git:2.52.0")
+            .with_directory("/files", files)
+            .with_exec(["sh", "-c", "test -x /files/run.sh && test ! -L /files/run.sh && readlink /files/link.sh"])
+            .stdout()
+        )
+
+        TestCase().assertEqual("run.sh\n", modes)
+
+    async def get_files_at_ref_fails_for_unknown_ref(self) -> None:
+        """Fail instead of returning an empty directory when the ref does not exist."""
+        git = dag.git(source=self.repo_on_main_branch())
+        test_case = TestCase()
+
+        try:
+            await git.get_files_at_ref(ref="mian", paths=["README.md"]).entries()
+        except dagger.ExecError as error:
+            test_case.assertIn("unknown ref mian", error.stderr)
+        else:
+            test_case.fail("get_files_at_ref should fail for an unknown ref")
+
+    async def get_tree_at_ref_exports_requested_subtrees(self) -> None:
+        """Export only requested subtrees of an older ref without checking it out."""
+        git = dag.git(source=self.repo_with_monorepo_pull_request_branch().directory("/work/repo"))
+
+        base_tree = git.get_tree_at_ref(ref="main", paths=["services/api", "docs/main-only.md", "missing"])
+        feature_tree = git.get_tree_at_ref(ref="feature", paths=["services/api"])
+        full_tree = git.get_tree_at_ref(ref="main")
+
+        test_case = TestCase()
+        test_case.assertEqual(["docs/main-only.md", "services/api/app.py"], sorted(await base_tree.glob("**/*.*")))
+        test_case.assertEqual("base\n", await base_tree.file("services/api/app.py").contents())
+        test_case.assertEqual(
+            ["services/api/app.py", "services/api/internal/jobs/worker.py"],
+            sorted(await feature_tree.glob("**/*.*")),
+        )
+        test_case.assertEqual("feature\n", await feature_tree.file("services/api/app.py").contents())
+        test_case.assertEqual(
+            [
+                "docs/guide.md",
+                "docs/main-only.md",
+                "packages/shared/lib.py",
+                "services/api/app.py",
+                "services/web/app.py",
+            ],
+            sorted(await full_tree.glob("**/*.*")),
+        )
+
+    async def get_tree_at_ref_fails_for_unknown_ref(self) -> None:
+        """Fail instead of returning an empty tree when the ref does not exist."""
+        git = dag.git(source=self.repo_on_main_branch())
+        test_case = TestCase()
+
+        try:
+            await git.get_tree_at_ref(ref="mian").entries()
+        except dagger.ExecError as error:
+            test_case.assertIn("unknown ref mian", error.stderr)
+        else:
+            test_case.fail("get_tree_at_ref should fail for an unknown ref")
+
+    async def get_lfs_files_at_ref_replaces_pointers_with_objects(self) -> None:
+        """Replace LFS pointer files with their objects while other files keep their contents."""
+        git = dag.git(source=self.repo_with_local_lfs_object())
+        paths = ["README.md", "assets/asset.bin", "missing.bin"]
+
+        pointer_files = git.get_files_at_ref(ref="HEAD", paths=paths)
+        lfs_files = git.get_lfs_files_at_ref(ref="HEAD", paths=paths)
+        skip_smudge = await git.container().env_variable("GIT_LFS_SKIP_SMUDGE")
+
+        test_case = TestCase()
+        test_case.assertEqual("1", skip_smudge)
+        test_case.assertTrue(
+            (await pointer_files.file("assets/asset.bin").contents()).startswith(
+                "version https://git-lfs.github.com/spec/v1\n"
+            )
+        )
+        test_case.assertEqual(["README.md", "assets/asset.bin"], sorted(await lfs_files.glob("**/*.*")))
+        test_case.assertEqual("large asset\n", await lfs_files.file("assets/asset.bin").contents())
+        test_case.assertEqual("readme\n", await lfs_files.file("README.md").contents())
+
+    async def get_lfs_files_at_ref_fetches_missing_objects_from_remote(self) -> None:
+        """Fetch an LFS object missing from the local store, or fail clearly when the image has no git-lfs."""
+        git = dag.git(source=self.repo_with_remote_lfs_object())
+        has_git_lfs = await git.container().with_exec(["sh", "-c", "command -v git-lfs || :"]).stdout()
+        lfs_files = git.get_lfs_files_at_ref(ref="HEAD", paths=["assets/asset.bin"])
+
+        test_case = TestCase()
+        if has_git_lfs.strip():
+            test_case.assertEqual("remote asset\n", await lfs_files.file("assets/asset.bin").contents())
+            return
+        try:
+            await lfs_files.entries()
+        except dagger.ExecError as error:
+            test_case.assertIn("git-lfs is required to fetch LFS objects", error.stderr)
+        else:
+            test_case.fail("get_lfs_files_at_ref should fail without git-lfs when an object is missing")
+
+    async def get_lfs_files_at_ref_rejects_include_pattern_characters(self) -> None:
+        """Reject paths that would change the meaning of the git lfs fetch include patterns."""
+        git = dag.git(source=self.repo_with_local_lfs_object())
+
+        test_case = TestCase()
+        for path in ["assets/a,b.bin", "assets/*.bin", "assets/asset?.bin", "assets/[ab].bin"]:
+            try:
+                await git.get_lfs_files_at_ref(ref="HEAD", paths=[path]).entries()
+            except dagger.QueryError as error:
+                test_case.assertIn(
+                    f"LFS file paths cannot contain commas or glob characters (,*?[\\): {path}", str(error)
+                )
+            else:
+                test_case.fail(f"get_lfs_files_at_ref should reject {path}")
@@ -19,6 +19,17 @@ class SyntheticGitRepos:
             .directory("/work/repo")
         )
 
+    def repo_without_commits(self) -> dagger.Directory:
+        """Return a git repo on an unborn main branch with one untracked file."""
+        return (
+            dag.container()
+            .from_("docker.io/alpine/git:2.52.0")
+            .with_workdir("/work/repo")
+            .with_exec(["git", "init", "--initial-branch", "main", "."])
+            .with_exec(["sh", "-c", "printf 'draft\\n' > draft.txt"])
+            .directory("/work/repo")
+        )
+
     def repo_on_main_branch(self) -> dagger.Directory:
         """Return a git repo with HEAD attached to the main branch."""
         return (
@@ -32,6 +43,26 @@ class SyntheticGitRepos:
             .directory("/work/repo")
         )
 
+    def repo_with_executable_and_symlink(self) -> dagger.Directory:
+        """Return a git repo on main with an executable script and a symlink to it."""
+        return (
+            dag.container()
+            .from_("docker.io/alpine/git:2.52.0")
+            .with_workdir("/work/repo")
+            .with_exec(["git", "init", "--initial-branch", "main", "."])
+            .with_exec(["git", "config", "user.name", "Dagger Test"])
+            .with_exec(["git", "config", "user.email", "dagger-test@example.local"])
+            .with_exec(
+                [
+                    "sh",
+                    "-c",
+                    "printf '#!/bin/sh\\n' > run.sh && chmod +x run.sh && ln -s run.sh link.sh && "
+                    "git add run.sh link.sh && git commit -m scripts",
+                ]
+            )
+            .directory("/work/repo")
+        )
+
     def repo_with_detached_head(self) -> dagger.Directory:
         """Return a git repo with HEAD detached at the current commit."""
         return (
@@ -46,6 +77,31 @@ class SyntheticGitRepos:
             .directory("/work/repo")
         )
 
+    def repo_with_packed_refs(self) -> dagger.Directory:
+        """Return a git repo whose branch and tag refs live only in packed-refs."""
+        return (
+            dag.container()
+            .from_("docker.io/alpine/git:2.52.0")
+            .with_workdir("/work/repo")
+            .with_directory("/work/repo", self.repo_with_version_tags())
+            .with_exec(["git", "pack-refs", "--all"])
+            .directory("/work/repo")
+        )
+
+    def repo_with_reftable_refs(self) -> dagger.Directory:
+        """Return a git repo that stores refs in the reftable format."""
+        return (
+            dag.container()
+            .from_("docker.io/alpine/git:2.52.0")
+            .with_workdir("/work/repo")
+            .with_exec(["git", "init", "--ref-format=reftable", "--initial-branch", "main", "."])
+            .with_exec(["git", "config", "user.name", "Dagger Test"])
+            .with_exec(["git", "config", "user.email", "dagger-test@example.local"])
+            .with_exec(["sh", "-c", "printf 'initial\\n' > README.md && git add README.md && git commit -m initial"])
+            .with_exec(["git", "tag", "v1.0.0"])
+            .directory("/work/repo")
+        )
+
     def repo_with_default_branch_remote(self) -> dagger.Directory:
         """Return a git repo with a local bare origin whose default branch is main."""
         return (
@@ -81,6 +137,93 @@ class SyntheticGitRepos:
             .directory("/work/repo")
         )
 
+    def repo_with_worktree_changes_under_modules(self) -> dagger.Directory:
+        """Return a git repo with modified, untracked, and newline-named files under modules/."""
+        return (
+            dag.container()
+            .from_("docker.io/alpine/git:2.52.0")
+            .with_workdir("/work/repo")
+            .with_exec(["git", "init", "--initial-branch", "main", "."])
+            .with_exec(["git", "config", "user.name", "Dagger Test"])
+            .with_exec(["git", "config", "user.email", "dagger-test@example.local"])
+            .with_exec(
+                [
+                    "sh",
+                    "-c",
+                    (
+                        "mkdir -p modules/alpha modules/beta docs && "
+                        "printf 'alpha\\n' > modules/alpha/main.py && "
+                        "printf 'beta\\n' > modules/beta/main.py && "
+                        "printf 'docs\\n' > docs/readme.md && "
+                        "git add . && git commit -m initial"
+                    ),
+                ]
+            )
+            .with_exec(
+                [
+                    "sh",
+                    "-c",
+                    (
+                        "mkdir -p 'modules/gamma dir' modules/delta && "
+                        "printf 'changed\\n' > modules/alpha/main.py && "
+                        "printf 'new\\n' > 'modules/gamma dir/new file.txt' && "
+                        "printf 'odd\\n' > \"modules/delta/$(printf 'line\\nbreak').txt\" && "
+                        "printf 'root\\n' > modules/notes.txt"
+                    ),
+                ]
+            )
+            .directory("/work/repo")
+        )
+
+    def repo_with_changed_submodule(self) -> dagger.Directory:
+        """Return a superproject whose feature branch bumps one of two deinitialised submodules."""
+        return (
+            dag.container()
+            .from_("docker.io/alpine/git:2.52.0")
+            .with_workdir("/work")
+            .with_exec(["git", "config", "--global", "user.name", "Dagger Test"])
+            .with_exec(["git", "config", "--global", "user.email", "dagger-test@example.local"])
+            .with_exec(
+                [
+                    "sh",
+                    "-c",
+                    (
+                        "for name in sub-a sub-b; do "
+                        'git init --initial-branch main "$name" && cd "$name" && mkdir src && '
+                        "printf '%s\\n' \"$name\" > src/lib.py && git add . && git commit -m initial && cd ..; "
+                        "done"
+                    ),
+                ]
+            )
+            .with_workdir("/work/repo")
+            .with_exec(["git", "init", "--initial-branch", "main", "."])
+            .with_exec(
+                [
+                    "sh",
+                    "-c",
+                    (
+                        "git -c protocol.file.allow=always submodule add /work/sub-a libs/sub-a && "
+                        "git -c protocol.file.allow=always submodule add /work/sub-b libs/sub-b && "
+                        "printf 'app\\n' > app.py && git add . && git commit -m base"
+                    ),
+                ]
+            )
+            .with_exec(["git", "checkout", "-b", "feature"])
+            .with_exec(
+                [
+                    "sh",
+                    "-c",
+                    (
+                        "cd libs/sub-a && printf 'changed\\n' > src/lib.py && mkdir -p docs && "
+                        "printf 'docs\\n' > docs/new.md && git add . && git commit -m bump && cd ../.. && "
+                        "printf 'app feature\\n' > app.py && git add app.py libs/sub-a && git commit -m 'bump sub-a'"
+                    ),
+                ]
+            )
+            .with_exec(["git", "submodule", "deinit", "--force", "--all"])
+            .directory("/work/repo")
+        )
+
     def repo_with_file_versions_at_refs(self) -> dagger.Directory:
         """Return a git repo with different file contents on HEAD and a tag."""
         return (
@@ -100,6 +243,66 @@ class SyntheticGitRepos:
             .directory("/work/repo")
         )
 
+    def repo_with_local_lfs_object(self) -> dagger.Directory:
+        """Return a git repo with an LFS pointer whose object is already in the local LFS store."""
+        return (
+            dag.container()
+            .from_("docker.io/alpine/git:2.52.0")
+            .with_workdir("/work/repo")
+            .with_exec(["git", "init", "--initial-branch", "main", "."])
+            .with_exec(["git", "config", "user.name", "Dagger Test"])
+            .with_exec(["git", "config", "user.email", "dagger-test@example.local"])
+            .with_exec(
+                [
+                    "sh",
+                    "-c",
+                    (
+                        "printf 'large asset\\n' > /work/asset.bin && "
+                        "oid=$(sha256sum /work/asset.bin | cut -d ' ' -f 1) && "
+                        'store=".git/lfs/objects/$(echo "$oid" | cut -c1-2)/$(echo "$oid" | cut -c3-4)" && '
+                        'mkdir -p assets "$store" && cp /work/asset.bin "$store/$oid" && '
+                        "printf 'version https://git-lfs.github.com/spec/v1\\noid sha256:%s\\nsize 12\\n' \"$oid\" "
+                        "> assets/asset.bin && printf 'readme\\n' > README.md && "
+                        "git add README.md assets && git commit -m assets"
+                    ),
+                ]
+            )
+            .directory("/work/repo")
+        )
+
+    def repo_with_remote_lfs_object(self) -> dagger.Directory:
+        """Return a git repo with an LFS pointer whose object is only in its local bare remote's LFS store.
+
+        The repo is built at /tmp/git/repo, where the Git module mounts sources, so the absolute remote path
+        that git-lfs needs for its file transfer adapter is valid both here and inside the module.
+        """
+        return (
+            dag.container()
+            .from_("docker.io/alpine/git:2.52.0")
+            .with_workdir("/tmp/git/repo")
+            .with_exec(["git", "init", "--initial-branch", "main", "."])
+            .with_exec(["git", "config", "user.name", "Dagger Test"])
+            .with_exec(["git", "config", "user.email", "dagger-test@example.local"])
+            .with_exec(
+                [
+                    "sh",
+                    "-c",
+                    (
+                        "printf 'remote asset\\n' > /tmp/asset.bin && "
+                        "oid=$(sha256sum /tmp/asset.bin | cut -d ' ' -f 1) && "
+                        "mkdir -p assets && "
+                        "printf 'version https://git-lfs.github.com/spec/v1\\noid sha256:%s\\nsize 13\\n' \"$oid\" "
+                        "> assets/asset.bin && git add assets && git commit -m assets && "
+                        "git clone --bare . .remote/origin.git && "
+                        'store=".remote/origin.git/lfs/objects/$(echo "$oid" | cut -c1-2)/$(echo "$oid" | cut -c3-4)" && '
+                        'mkdir -p "$store" && cp /tmp/asset.bin "$store/$oid"'
+                    ),
+                ]
+            )
+            .with_exec(["git", "remote", "add", "origin", "/tmp/git/repo/.remote/origin.git"])
+            .directory("/tmp/git/repo")
+        )
+
     def repo_with_version_tags(self) -> dagger.Directory:
         """Return a git repo with tags that sort differently by version and refname."""
         return (
@@ -182,12 +385,50 @@ class SyntheticGitRepos:
             )
             .with_exec(["mkdir", "-p", ".remote"])
             .with_exec(["git", "clone", "--bare", ".", ".remote/origin.git"])
+            .with_exec(["git", "-C", ".remote/origin.git", "config", "uploadpack.allowFilter", "true"])
             .with_exec(["git", "checkout", "main"])
             .with_exec(["git", "branch", "-D", "feature"])
             .with_exec(["git", "remote", "add", "origin", ".remote/origin.git"])
             .directory("/work/repo")
         )
 
+    def repo_with_fork_remotes(self) -> dagger.Directory:
+        """Return a git repo with origin and upstream local bare remotes that each have branches missing locally.
+
+        Both remotes also carry the same v1 tag, so their fetches update the same tag ref.
+        """
+        return (
+            dag.container()
+            .from_("docker.io/alpine/git:2.52.0")
+            .with_workdir("/work/repo")
+            .with_exec(["git", "init", "--initial-branch", "main", "."])
+            .with_exec(["git", "config", "user.name", "Dagger Test"])
+            .with_exec(["git", "config", "user.email", "dagger-test@example.local"])
+            .with_exec(["sh", "-c", "printf 'initial\\n' > README.md && git add README.md && git commit -m initial"])
+            .with_exec(["git", "checkout", "-b", "feature"])
+            .with_exec(
+                ["sh", "-c", "printf 'feature\\n' > feature.txt && git add feature.txt && git commit -m feature"]
+            )
+            .with_exec(["git", "checkout", "-b", "release", "main"])
+            .with_exec(
+                ["sh", "-c", "printf 'release\\n' > release.txt && git add release.txt && git commit -m release"]
+            )
+            .with_exec(["git", "tag", "v1", "main"])
+            .with_exec(["mkdir", "-p", ".remote"])
+            .with_exec(["git", "clone", "--bare", "--branch", "feature", ".", ".remote/origin.git"])
+            .with_exec(["git", "-C", ".remote/origin.git", "branch", "-D", "release"])
+            .with_exec(["git", "clone", "--bare", "--branch", "release", ".", ".remote/upstream.git"])
+            .with_exec(["git", "-C", ".remote/upstream.git", "branch", "-D", "feature"])
+            .with_exec(["git", "checkout", "main"])
+            .with_exec(["git", "branch", "-D", "feature", "release"])
+            .with_exec(["git", "tag", "-d", "v1"])
+            .with_exec(["git", "reflog", "expire", "--expire=now", "--all"])
+            .with_exec(["git", "gc", "--prune=now", "--quiet"])
+            .with_exec(["git", "remote", "add", "origin", ".remote/origin.git"])
+            .with_exec(["git", "remote", "add", "upstream", ".remote/upstream.git"])
+            .directory("/work/repo")
+        )
+
     def shallow_repo_with_remote_history(self) -> dagger.Directory:
         """Return a shallow clone with a local bare remote that has full history."""
         return (
@@ -210,6 +451,44 @@ class SyntheticGitRepos:
             .directory("/work/repo")
         )
 
+    def shallow_repo_with_diverged_remote_history(self) -> dagger.Directory:
+        """Return a depth-one clone of diverged branches whose merge base is four commits deep."""
+        return (
+            dag.container()
+            .from_("docker.io/alpine/git:2.52.0")
+            .with_workdir("/work/source")
+            .with_exec(["git", "init", "--initial-branch", "main", "."])
+            .with_exec(["git", "config", "user.name", "Dagger Test"])
+            .with_exec(["git", "config", "user.email", "dagger-test@example.local"])
+            .with_exec(
+                [
+                    "sh",
+                    "-c",
+                    (
+                        "for commit in one two three base; do "
+                        'printf "%s\\n" "$commit" > history.txt && git add . && git commit -m "$commit"; '
+                        "done && "
+                        "git checkout -b feature && "
+                        "for commit in feature-one feature-two; do "
+                        'printf "%s\\n" "$commit" > feature.txt && git add . && git commit -m "$commit"; '
+                        "done && "
+                        "git checkout main && "
+                        "for commit in main-one main-two main-three; do "
+                        'printf "%s\\n" "$commit" > history.txt && git add . && git commit -m "$commit"; '
+                        "done"
+                    ),
+                ]
+            )
+            .with_workdir("/work")
+            .with_exec(["git", "clone", "--bare", "/work/source", "/work/origin.git"])
+            .with_exec(["git", "clone", "--depth", "1", "--no-single-branch", "file:///work/origin.git", "/work/repo"])
+            .with_exec(["mkdir", "-p", "/work/repo/.remote"])
+            .with_exec(["cp", "-a", "/work/origin.git", "/work/repo/.remote/origin.git"])
+            .with_workdir("/work/repo")
+            .with_exec(["git", "remote", "set-url", "origin", ".remote/origin.git"])
+            .directory("/work/repo")
+        )
+
     def repo_with_diverged_branches(self) -> dagger.Container:
         """Return a git repo with base and feature branches diverged from one commit."""
         return (
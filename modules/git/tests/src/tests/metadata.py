@@ -1,5 +1,6 @@
 from unittest import TestCase
 
+import dagger
 from dagger import dag
 
 from .fixtures import SyntheticGitRepos
@@ -16,6 +17,14 @@ class MetadataTests(SyntheticGitRepos):
         await self.remote_url_and_default_branch()
         await self.status_porcelain_for_clean_worktree()
         await self.status_porcelain_for_dirty_worktree()
+        await self.status_porcelain_for_repo_without_commits()
+        await self.snapshot_for_branch_with_remote()
+        await self.snapshot_for_dirty_shallow_and_detached_repos()
+        await self.git_dir_metadata_matches_container_metadata()
+        await self.git_dir_metadata_falls_back_for_reftable_refs()
+        await self.git_dir_only_mount_answers_history_queries()
+        await self.git_dir_only_rejects_worktree_functions()
+        await self.container_rejects_non_repository_source()
 
     async def head_sha(self) -> None:
         """Call the parent Git module public API and assert full SHA shape."""
@@ -90,3 +99,127 @@ class MetadataTests(SyntheticGitRepos):
         test_case.assertIn(" M README.md", status)
         test_case.assertIn("?? untracked.txt", status)
         test_case.assertFalse(is_clean)
+
+    async def status_porcelain_for_repo_without_commits(self) -> None:
+        """Return status for an unborn HEAD and fail clearly when asked for its SHA."""
+        git = dag.git(source=self.repo_without_commits())
+
+        status = await git.get_status_porcelain()
+        is_clean = await git.has_clean_worktree()
+        current_ref = await git.get_current_ref()
+
+        test_case = TestCase()
+        test_case.assertEqual("?? draft.txt\n", status)
+        test_case.assertFalse(is_clean)
+        test_case.assertEqual("refs/heads/main", current_ref.strip())
+        try:
+            await git.get_short_commit_sha()
+        except dagger.QueryError as error:
+            test_case.assertIn("HEAD has no commits yet on refs/heads/main", str(error))
+        else:
+            test_case.fail("get_short_commit_sha should fail without commits")
+
+    async def snapshot_for_branch_with_remote(self) -> None:
+        """Return HEAD, branch, and remote metadata from one snapshot."""
+        git = dag.git(source=self.repo_with_default_branch_remote())
+
+        snapshot = git.get_snapshot(short_sha_length=10)
+        head_sha = await snapshot.get_head_sha()
+
+        test_case = TestCase()
+        test_case.assertEqual((await git.get_head_sha()).strip(), head_sha)
+        test_case.assertEqual(head_sha[:10], await snapshot.get_short_commit_sha())
+        test_case.assertEqual("main", await snapshot.get_current_branch())
+        test_case.assertEqual("refs/heads/main", await snapshot.get_current_ref())
+        test_case.assertEqual(["origin"], await snapshot.get_remotes())
+        test_case.assertEqual(".remote/origin.git", await snapshot.get_remote_url(remote="origin"))
+        test_case.assertFalse(await snapshot.has_shallow_history())
+
+    async def snapshot_for_dirty_shallow_and_detached_repos(self) -> None:
+        """Return status, shallow, and detached HEAD metadata from snapshots."""
+        dirty_snapshot = dag.git(source=self.repo_with_dirty_worktree()).get_snapshot()
+        shallow_snapshot = dag.git(source=self.shallow_repo_with_remote_history()).get_snapshot(include_status=False)
+        detached_snapshot = dag.git(source=self.repo_with_detached_head()).get_snapshot()
+
+        status = await dirty_snapshot.get_status_porcelain()
+        detached_head_sha = await detached_snapshot.get_head_sha()
+
+        test_case = TestCase()
+        test_case.assertIn(" M README.md", status)
+        test_case.assertIn("?? untracked.txt", status)
+        test_case.assertFalse(await dirty_snapshot.has_clean_worktree())
+        test_case.assertTrue(await shallow_snapshot.has_shallow_history())
+        test_case.assertEqual("", await detached_snapshot.get_current_branch())
+        test_case.assertEqual(detached_head_sha, await detached_snapshot.get_current_ref())
+        test_case.assertEqual([], await detached_snapshot.get_remotes())
+        test_case.assertTrue(await detached_snapshot.has_clean_worktree())
+
+    async def git_dir_metadata_matches_container_metadata(self) -> None:
+        """Answer ref and remote queries from .git files with the same results as the Git container."""
+        repo = self.repo_with_default_branch_remote()
+        git = dag.git(source=repo)
+        snapshot = dag.git(source=repo).get_snapshot(include_status=False)
+        packed_git = dag.git(source=self.repo_with_packed_refs())
+        packed_sha = await packed_git.container().with_exec(["git", "rev-parse", "HEAD"]).stdout()
+
+        test_case = TestCase()
+        test_case.assertEqual(await snapshot.get_head_sha(), await git.get_head_sha())
+        test_case.assertEqual(await snapshot.get_current_branch(), await git.get_current_branch())
+        test_case.assertEqual(await snapshot.get_current_ref(), await git.get_current_ref())
+        test_case.assertEqual(await snapshot.get_remote_url(), await git.get_remote_url())
+        test_case.assertEqual(packed_sha.strip(), await packed_git.get_head_sha())
+
+    async def git_dir_metadata_falls_back_for_reftable_refs(self) -> None:
+        """Fall back to the Git container when refs use reftable storage."""
+        repo = self.repo_with_reftable_refs()
+        git = dag.git(source=repo)
+        head_sha = await dag.git(source=repo).container().with_exec(["git", "rev-parse", "HEAD"]).stdout()
+
+        test_case = TestCase()
+        test_case.assertEqual("main", await git.get_current_branch())
+        test_case.assertEqual("refs/heads/main", await git.get_current_ref())
+        test_case.assertEqual(head_sha.strip(), await git.get_head_sha())
+        test_case.assertTrue(await git.has_tag(tag="v1.0.0"))
+        test_case.assertFalse(await git.has_tag(tag="v2.0.0"))
+
+    async def git_dir_only_mount_answers_history_queries(self) -> None:
+        """Answer ref and diff queries from a bare-style .git mount without copying the worktree."""
+        repo = self.repo_with_diverged_branches()
+        git = dag.git(source=repo.directory("/work/repo"), git_dir_only=True)
+
+        entries = await git.container().with_exec(["ls", "-A"]).stdout()
+        is_bare = await git.container().with_exec(["git", "rev-parse", "--is-bare-repository"]).stdout()
+        merge_base = await git.get_merge_base(base_ref="main", head_ref="feature")
+        expected_merge_base = await repo.with_exec(["git", "merge-base", "main", "feature"]).stdout()
+        changed_files = await git.get_changed_files_since_merge_base(base_ref="main", head_ref="feature")
+
+        test_case = TestCase()
+        test_case.assertNotIn("README.md", entries.split())
+        test_case.assertIn("HEAD", entries.split())
+        test_case.assertEqual("true", is_bare.strip())
+        test_case.assertEqual(expected_merge_base.strip(), merge_base)
+        test_case.assertEqual(["feature.txt"], changed_files)
+
+    async def git_dir_only_rejects_worktree_functions(self) -> None:
+        """Reject checkout-index based exports with a clear error when only .git is mounted."""
+        git = dag.git(source=self.repo_with_diverged_branches().directory("/work/repo"), git_dir_only=True)
+        test_case = TestCase()
+
+        try:
+            await git.get_files_at_ref(ref="main", paths=["README.md"]).entries()
+        except dagger.QueryError as error:
+            test_case.assertIn("get_files_at_ref needs a worktree and cannot run with git_dir_only", str(error))
+        else:
+            test_case.fail("get_files_at_ref should reject git_dir_only sources")
+
+    async def container_rejects_non_repository_source(self) -> None:
+        """Fail with a clear error when the source is not a Git repository."""
+        git = dag.git(source=dag.directory().with_new_file("README.md", "not a repo\n"))
+        test_case = TestCase()
+
+        try:
+            await git.container().sync()
+        except dagger.ExecError as error:
+            test_case.assertIn("is not a git repo", error.stderr)
+        else:
+            test_case.fail("container should reject a source without .git")
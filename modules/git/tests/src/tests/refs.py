@@ -11,11 +11,22 @@ class RefTests(SyntheticGitRepos):
 
     async def all(self) -> None:
         await self.with_fetched_refs_missing_branch()
+        await self.with_fetched_refs_blobless_branch()
+        await self.with_fetched_remotes_in_parallel()
+        await self.with_fetched_remotes_rejects_unknown_remote_refspecs()
         await self.ensure_ref_resolves_existing_ref()
         await self.ensure_ref_fails_for_missing_ref()
         await self.with_unshallow_fetches_full_history()
         await self.with_unshallow_keeps_full_repository_usable()
+        await self.with_object_cache_keeps_fetched_objects()
+        await self.with_maintenance_writes_commit_graph_and_multi_pack_index()
+        await self.with_maintenance_rejects_unknown_tasks()
+        await self.with_maintenance_rejects_shared_object_cache()
+        await self.with_merge_base_available_deepens_geometrically()
+        await self.with_merge_base_available_skips_fetch_when_available()
         await self.merge_base_for_diverged_branches()
+        await self.merge_bases_for_many_pairs()
+        await self.cached_merge_bases_for_since_merge_base_diffs()
 
     async def with_fetched_refs_missing_branch(self) -> None:
         """Fetch a missing remote branch from a local bare remote."""
@@ -38,6 +49,70 @@ class RefTests(SyntheticGitRepos):
         test_case.assertRegex(fetched_ref.strip(), r"^[0-9a-f]+$")
         test_case.assertEqual(["feature.txt"], changed_files)
 
+    async def with_fetched_refs_blobless_branch(self) -> None:
+        """Fetch a branch as a blobless partial clone and still answer diff and file queries from it."""
+        fetched_git = dag.git(source=self.repo_with_missing_remote_branch()).with_fetched_refs(
+            refspecs=["refs/heads/feature:refs/remotes/origin/feature"],
+            filter="blob:none",
+            no_tags=True,
+            negotiation_tips=["main"],
+        )
+
+        promisor = await fetched_git.container().with_exec(["git", "config", "remote.origin.promisor"]).stdout()
+        changed_files = await fetched_git.get_changed_files(base_ref="main", head_ref="origin/feature")
+        contents = await fetched_git.get_file_contents_at_ref(ref="origin/feature", path="feature.txt")
+
+        test_case = TestCase()
+        test_case.assertEqual("true", promisor.strip())
+        test_case.assertEqual(["feature.txt"], changed_files)
+        test_case.assertEqual("feature\n", contents)
+
+    async def with_fetched_remotes_in_parallel(self) -> None:
+        """Fetch origin and upstream in parallel with per-remote refspecs and report per-remote stats."""
+        git = dag.git(source=self.repo_with_fork_remotes()).with_fetched_remotes(
+            remotes=["origin", "upstream"],
+            refspecs=["upstream=+refs/heads/release:refs/remotes/upstream/release"],
+            jobs=2,
+        )
+
+        remote_refs = (
+            await git.container()
+            .with_exec(
+                ["git", "for-each-ref", "--format=%(refname:short)", "--exclude=refs/remotes/*/HEAD", "refs/remotes"]
+            )
+            .stdout()
+        )
+        release_file = await git.container().with_exec(["git", "show", "upstream/release:release.txt"]).stdout()
+        tags = await git.container().with_exec(["git", "tag", "--list"]).stdout()
+        upstream_fetch = (
+            await git.container().with_exec(["git", "config", "--get-all", "remote.upstream.fetch"]).stdout()
+        )
+        await git.container().with_exec(["git", "fsck", "--connectivity-only"]).sync()
+        stats = [record.split("\t") for record in await git.get_fetch_stats()]
+
+        test_case = TestCase()
+        test_case.assertEqual(["origin/feature", "origin/main", "upstream/release"], sorted(remote_refs.split()))
+        test_case.assertEqual("release\n", release_file)
+        test_case.assertEqual(["v1"], tags.split())
+        test_case.assertEqual("+refs/heads/*:refs/remotes/upstream/*\n", upstream_fetch)
+        test_case.assertEqual(["origin", "upstream"], [remote for remote, _, _ in stats])
+        test_case.assertTrue(all(int(objects) > 0 and int(duration) >= 0 for _, objects, duration in stats))
+
+    async def with_fetched_remotes_rejects_unknown_remote_refspecs(self) -> None:
+        """Fail clearly for refspecs that do not name one of the fetched remotes."""
+        git = dag.git(source=self.repo_with_fork_remotes()).with_fetched_remotes(
+            remotes=["origin"],
+            refspecs=["upstream=refs/heads/release"],
+        )
+        test_case = TestCase()
+
+        try:
+            await git.container().sync()
+        except dagger.QueryError as error:
+            test_case.assertIn("Invalid remote refspec: upstream=refs/heads/release", str(error))
+        else:
+            test_case.fail("with_fetched_remotes should reject refspecs for other remotes")
+
     async def ensure_ref_resolves_existing_ref(self) -> None:
         """Return the resolved object SHA for an existing ref."""
         repo = self.repo_with_local_tag()
@@ -89,6 +164,111 @@ class RefTests(SyntheticGitRepos):
         test_case = TestCase()
         test_case.assertRegex(resolved_ref, r"^[0-9a-f]+$")
 
+    async def with_object_cache_keeps_fetched_objects(self) -> None:
+        """Keep objects fetched through the object cache available to a later fresh checkout."""
+        source = self.shallow_repo_with_remote_history()
+        full_git = dag.git(source=source).with_object_cache(key="git-tests-shallow-history").with_unshallow()
+        root_sha = await full_git.container().with_exec(["git", "rev-list", "--max-parents=0", "HEAD"]).stdout()
+
+        cached_git = dag.git(source=source).with_object_cache(key="git-tests-shallow-history")
+        cached_type = await cached_git.container().with_exec(["git", "cat-file", "-t", root_sha.strip()]).stdout()
+        checkout_type = (
+            await dag.git(source=source)
+            .container()
+            .with_exec(["sh", "-c", 'git cat-file -t "$1" 2>/dev/null || printf "missing\\n"', "sh", root_sha.strip()])
+            .stdout()
+        )
+
+        test_case = TestCase()
+        test_case.assertEqual("commit", cached_type.strip())
+        test_case.assertEqual("missing", checkout_type.strip())
+
+    async def with_maintenance_writes_commit_graph_and_multi_pack_index(self) -> None:
+        """Write a commit-graph with Bloom filters and a multi-pack-index before history queries."""
+        repo = self.repo_with_diverged_branches().with_exec(["git", "gc", "--quiet"])
+        git = dag.git(source=repo.directory("/work/repo")).with_maintenance()
+
+        await git.container().with_exec(["git", "commit-graph", "verify"]).sync()
+        await git.container().with_exec(["git", "multi-pack-index", "verify"]).sync()
+        bloom_chunk = (
+            await git.container()
+            .with_exec(["sh", "-c", "grep -c BIDX .git/objects/info/commit-graph || true"])
+            .stdout()
+        )
+        merge_base = await git.get_merge_base(base_ref="main", head_ref="feature")
+        expected_merge_base = await repo.with_exec(["git", "merge-base", "main", "feature"]).stdout()
+
+        test_case = TestCase()
+        test_case.assertNotEqual("0", bloom_chunk.strip())
+        test_case.assertEqual(expected_merge_base.strip(), merge_base)
+
+    async def with_maintenance_rejects_unknown_tasks(self) -> None:
+        """Fail clearly for unsupported maintenance tasks."""
+        git = dag.git(source=self.repo_with_local_tag())
+        test_case = TestCase()
+
+        try:
+            await git.with_maintenance(tasks=["gc"]).container().sync()
+        except dagger.QueryError as error:
+            test_case.assertIn("Unsupported maintenance task: gc", str(error))
+        else:
+            test_case.fail("with_maintenance should reject unknown tasks")
+
+    async def with_maintenance_rejects_shared_object_cache(self) -> None:
+        """Refuse to write a commit-graph into a cache volume other jobs share, but allow it before the cache."""
+        source = self.repo_with_local_tag()
+        test_case = TestCase()
+
+        try:
+            await (
+                dag.git(source=source)
+                .with_object_cache(key="git-tests-maintenance")
+                .with_maintenance()
+                .container()
+                .sync()
+            )
+        except dagger.QueryError as error:
+            test_case.assertIn("with_maintenance cannot write into the shared object cache", str(error))
+        else:
+            test_case.fail("with_maintenance should reject the shared object cache")
+
+        git = dag.git(source=source).with_maintenance().with_object_cache(key="git-tests-maintenance")
+        await (
+            git.container()
+            .with_exec(["sh", "-c", "test -f .git/objects/info/commit-graph && git commit-graph verify"])
+            .sync()
+        )
+
+    async def with_merge_base_available_deepens_geometrically(self) -> None:
+        """Deepen a shallow clone only until diverged branches have a merge base."""
+        git = dag.git(source=self.shallow_repo_with_diverged_remote_history()).with_merge_base_available(
+            base_ref="origin/main",
+            head_ref="origin/feature",
+            depth=1,
+        )
+
+        merge_base = await git.get_merge_base(base_ref="origin/main", head_ref="origin/feature")
+        merge_base_subject = await git.container().with_exec(["git", "log", "-1", "--format=%s", merge_base]).stdout()
+        is_shallow = await git.container().with_exec(["git", "rev-parse", "--is-shallow-repository"]).stdout()
+
+        test_case = TestCase()
+        test_case.assertEqual(2, await git.get_deepen_rounds())
+        test_case.assertEqual(5, await git.get_deepen_commits())
+        test_case.assertEqual("base", merge_base_subject.strip())
+        test_case.assertEqual("true", is_shallow.strip())
+
+    async def with_merge_base_available_skips_fetch_when_available(self) -> None:
+        """Leave a repository untouched when the merge base is already reachable."""
+        repo = self.repo_with_diverged_branches()
+        git = dag.git(source=repo.directory("/work/repo")).with_merge_base_available(
+            base_ref="main",
+            head_ref="feature",
+        )
+
+        test_case = TestCase()
+        test_case.assertEqual(0, await git.get_deepen_rounds())
+        test_case.assertEqual(0, await git.get_deepen_commits())
+
     async def merge_base_for_diverged_branches(self) -> None:
         """Return the shared commit for diverged base and head branches."""
         repo = self.repo_with_diverged_branches()
@@ -103,3 +283,35 @@ class RefTests(SyntheticGitRepos):
         test_case.assertEqual(expected_merge_base.strip(), merge_base)
         test_case.assertNotEqual(main_sha.strip(), merge_base)
         test_case.assertNotEqual(feature_sha.strip(), merge_base)
+
+    async def merge_bases_for_many_pairs(self) -> None:
+        """Return merge bases for several ref pairs from one batch call."""
+        repo = self.repo_with_diverged_branches()
+        git = dag.git(source=repo.directory("/work/repo"))
+
+        merge_bases = await git.get_merge_bases(pairs=["main...feature", "feature...main", "main...main"])
+        expected_merge_base = await repo.with_exec(["git", "merge-base", "main", "feature"]).stdout()
+        main_sha = await repo.with_exec(["git", "rev-parse", "main"]).stdout()
+
+        test_case = TestCase()
+        test_case.assertEqual(
+            [expected_merge_base.strip(), expected_merge_base.strip(), main_sha.strip()],
+            merge_bases,
+        )
+
+    async def cached_merge_bases_for_since_merge_base_diffs(self) -> None:
+        """Reuse cached merge bases for merge-base lookups and since-merge-base diffs."""
+        repo = self.repo_with_diverged_branches()
+        git = dag.git(source=repo.directory("/work/repo")).with_merge_bases(pairs=["main...feature"])
+
+        merge_base = await git.get_merge_base(base_ref="main", head_ref="feature")
+        batch_merge_bases = await git.get_merge_bases(pairs=["main...feature", "feature...main"])
+        changed_files = await git.get_changed_files_since_merge_base(base_ref="main", head_ref="feature")
+        changed_dirs = await git.get_changed_dirs_since_merge_base(base_ref="main", head_ref="feature")
+        expected_merge_base = await repo.with_exec(["git", "merge-base", "main", "feature"]).stdout()
+
+        test_case = TestCase()
+        test_case.assertEqual(expected_merge_base.strip(), merge_base)
+        test_case.assertEqual([merge_base, merge_base], batch_merge_bases)
+        test_case.assertEqual(["feature.txt"], changed_files)
+        test_case.assertEqual(["."], changed_dirs)
@@ -1,5 +1,6 @@
 from unittest import TestCase
 
+import dagger
 from dagger import dag
 
 from .fixtures import SyntheticGitRepos
@@ -10,16 +11,22 @@ class TagTests(SyntheticGitRepos):
 
     async def all(self) -> None:
         await self.with_fetched_tags()
+        await self.remote_tags_without_fetching()
         await self.get_tags()
         await self.get_tags_with_sort()
         await self.has_tag()
+        await self.has_tag_reads_packed_refs()
         await self.get_latest_tag()
         await self.tags_pointing_at()
+        await self.tag_index_answers_listing_and_latest_queries()
+        await self.tag_index_answers_points_at_queries()
         await self.create_lightweight_tag()
         await self.create_annotated_tag()
         await self.push_tag_to_local_bare_remote()
         await self.ensure_pushed_tag_creates_missing_remote_tag()
         await self.ensure_pushed_tag_accepts_existing_remote_tag()
+        await self.ensure_pushed_tags_reports_created_and_existing_tags()
+        await self.ensure_pushed_tags_confirms_tags_on_remote()
 
     async def with_fetched_tags(self) -> None:
         """Fetch tags from a local bare remote into a repository without local tags."""
@@ -32,6 +39,18 @@ class TagTests(SyntheticGitRepos):
 
         test_case.assertEqual(["v1.0.0"], await fetched_git.get_tags(pattern="v1.0.0"))
 
+    async def remote_tags_without_fetching(self) -> None:
+        """Query remote tags with ls-remote without fetching them into the local repository."""
+        git = dag.git(source=self.repo_with_remote_tag())
+
+        test_case = TestCase()
+        test_case.assertTrue(await git.has_remote_tag(tag="v1.0.0"))
+        test_case.assertFalse(await git.has_remote_tag(tag="v1.1.0"))
+        test_case.assertFalse(await git.has_remote_tag(tag="v1"))
+        test_case.assertEqual(["v1.0.0"], await git.get_remote_tags(pattern="v1.*"))
+        test_case.assertEqual([], await git.get_remote_tags(pattern="v2.*"))
+        test_case.assertFalse(await git.has_tag(tag="v1.0.0"))
+
     async def get_tags(self) -> None:
         """Return local tags through the verb-based get_tags function."""
         tags = await dag.git(source=self.repo_with_version_tags()).get_tags(pattern="v1.*")
@@ -62,6 +81,17 @@ class TagTests(SyntheticGitRepos):
         test_case.assertFalse(await git.has_tag(tag="v1.3.0"))
         test_case.assertFalse(await git.has_tag(tag="v1.*"))
 
+    async def has_tag_reads_packed_refs(self) -> None:
+        """Return whether an exact tag exists when tags live only in packed-refs."""
+        git = dag.git(source=self.repo_with_packed_refs())
+
+        test_case = TestCase()
+        test_case.assertTrue(await git.has_tag(tag="v1.2.0"))
+        test_case.assertTrue(await git.has_tag(tag="modules/helm/v2.0.0"))
+        test_case.assertFalse(await git.has_tag(tag="v1.3.0"))
+        test_case.assertFalse(await git.has_tag(tag="modules"))
+        test_case.assertFalse(await git.has_tag(tag="v1.*"))
+
     async def get_latest_tag(self) -> None:
         """Return the latest matching tag for semver and non-semver tag sets."""
         git = dag.git(source=self.repo_with_version_tags())
@@ -98,6 +128,51 @@ class TagTests(SyntheticGitRepos):
         test_case.assertEqual(["head", "v2.0.0"], head_tags)
         test_case.assertEqual(["first", "v1.0.0"], first_commit_tags)
 
+    async def tag_index_answers_listing_and_latest_queries(self) -> None:
+        """Answer existence, listing, and latest-by-prefix queries from one tag index."""
+        tag_index = dag.git(source=self.repo_with_version_tags()).get_tag_index()
+        module_index = dag.git(source=self.repo_with_version_tags()).get_tag_index(pattern="modules/*")
+
+        test_case = TestCase()
+        test_case.assertTrue(await tag_index.has_tag(tag="service/v2.0.0"))
+        test_case.assertFalse(await tag_index.has_tag(tag="v1.3.0"))
+        test_case.assertEqual(["v1.0.0", "v1.2.0", "v1.10.0"], await tag_index.get_tags(pattern="v1.*"))
+        test_case.assertEqual(
+            ["v1.0.0", "v1.10.0", "v1.2.0"],
+            await tag_index.get_tags(pattern="v1.*", sort="refname"),
+        )
+        test_case.assertEqual(
+            ["v1.10.0", "v1.2.0", "v1.0.0"],
+            await tag_index.get_tags(pattern="v1.*", sort="-version"),
+        )
+        test_case.assertEqual("v2.0.0", await tag_index.get_latest_tag(pattern="v*"))
+        test_case.assertEqual("release-2024.10", await tag_index.get_latest_tag(pattern="release-*", semver=False))
+        test_case.assertEqual("", await tag_index.get_latest_tag(pattern="release-*"))
+        test_case.assertEqual(
+            ["modules/helm/v2.0.0", "modules/plain/1.10.0", "modules/git/v3.0.0", ""],
+            await module_index.get_latest_tags(
+                prefixes=["modules/helm/", "modules/plain/", "modules/git/", "modules/missing/"],
+            ),
+        )
+        test_case.assertFalse(await module_index.has_tag(tag="v1.0.0"))
+
+    async def tag_index_answers_points_at_queries(self) -> None:
+        """Return tags pointing at HEAD, branches, short SHAs, and other commits from one tag index."""
+        repo = self.repo_with_tags_on_multiple_refs()
+        tag_index = dag.git(source=repo).get_tag_index()
+        first_sha = await dag.git(source=repo).container().with_exec(["git", "rev-parse", "HEAD~1"]).stdout()
+
+        test_case = TestCase()
+        test_case.assertEqual(["head", "v2.0.0"], sorted(await tag_index.get_tags_pointing_at()))
+        test_case.assertEqual(["first", "v1.0.0"], sorted(await tag_index.get_tags_pointing_at(ref=first_sha.strip())))
+        test_case.assertEqual(["first", "v1.0.0"], sorted(await tag_index.get_tags_pointing_at(ref="first")))
+        test_case.assertEqual(["head", "v2.0.0"], sorted(await tag_index.get_tags_pointing_at(ref="main")))
+        test_case.assertEqual(["first", "v1.0.0"], sorted(await tag_index.get_tags_pointing_at(ref="HEAD~1")))
+        test_case.assertEqual(
+            ["first", "v1.0.0"],
+            sorted(await tag_index.get_tags_pointing_at(ref=first_sha.strip()[:8])),
+        )
+
     async def create_lightweight_tag(self) -> None:
         """Create a lightweight tag on HEAD."""
         git = dag.git(source=self.repo_with_local_tag()).create_tag(tag="v1.1.0")
@@ -175,3 +250,36 @@ class TagTests(SyntheticGitRepos):
         result = await git.ensure_pushed_tag(tag="v1.0.0")
 
         TestCase().assertEqual("v1.0.0", result)
+
+    async def ensure_pushed_tags_reports_created_and_existing_tags(self) -> None:
+        """Create and atomically push missing tags while reporting existing remote tags."""
+        git = dag.git(source=self.repo_with_remote_tag())
+
+        result = await git.ensure_pushed_tags(tags=["v1.0.0", "v1.1.0", "v1.2.0", "v1.1.0"])
+        empty_result = await git.ensure_pushed_tags(tags=[])
+
+        test_case = TestCase()
+        test_case.assertEqual(["v1.0.0\texisting", "v1.1.0\tcreated", "v1.2.0\tcreated"], result)
+        test_case.assertEqual([], empty_result)
+
+    async def ensure_pushed_tags_confirms_tags_on_remote(self) -> None:
+        """Fail when a pushed tag is not listed by ls-remote against the bare remote afterwards."""
+        source = (
+            dag.container()
+            .from_("docker.io/alpine/git:2.52.0")
+            .with_directory("/work/repo", self.repo_with_remote_tag())
+            .with_new_file(
+                "/work/repo/.remote/origin.git/hooks/post-receive",
+                "#!/bin/sh\ngit update-ref -d refs/tags/v1.2.0\n",
+                permissions=0o755,
+            )
+            .directory("/work/repo")
+        )
+        test_case = TestCase()
+
+        try:
+            await dag.git(source=source).ensure_pushed_tags(tags=["v1.1.0", "v1.2.0"])
+        except dagger.QueryError as error:
+            test_case.assertIn("Tags are missing on remote origin after push: v1.2.0", str(error))
+        else:
+            test_case.fail("ensure_pushed_tags should fail when the remote drops a pushed tag")
@@ -252,8 +252,7 @@ class HelmCi:
             git_host=git_host,
             git_username=git_username,
         )
-        git = git.with_fetched_tags(remote=git_remote)
-        if await git.has_tag(tag=release_tag):
+        if await git.has_remote_tag(tag=release_tag, remote=git_remote):
             return f"skipped: release tag already exists\nrelease tag: {release_tag}"
 
         chart = self._helm(source=chart_source)